@@ -0,0 +1,119 @@
+"""
+Confere o LinuxEventBackend com um processo de verdade: copia o `sleep` do sistema para uma pasta
+temporária como valheim.exe, o executa e mede em quanto tempo ProcessScanner + backend percebem o
+início e o fim, do mesmo jeito que o PCMonitor faz (scan -> observar_pids -> aguardar).
+
+O polling de segurança fica em ESPERA segundos, então um fim percebido bem antes disso só pode ter
+vindo do pidfd. O início só é imediato com o proc connector (CAP_NET_ADMIN); sem ele, o polling cobre.
+
+Casos:
+- fim normal: o processo é colhido pelo pai logo ao sair (como um jogo aberto por um launcher)
+- zumbi: o pai não colhe; o jogo tem de contar como fechado e o pidfd não pode acordar o loop sem parar
+
+Uso: python checar_monitor_linux.py
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+from core_monitor import LinuxEventBackend, ProcessScanner
+
+EXECUTAVEL = "valheim.exe"
+ESPERA = 5.0        # intervalo do polling de segurança
+LIMITE_EVENTO = 1.0  # latência máxima aceita para algo percebido por evento
+
+
+class Checagem:
+    def __init__(self, binario: str):
+        self.binario = binario
+        self.scanner = ProcessScanner()
+        self.backend = LinuxEventBackend(intervalo_min=ESPERA, intervalo_max=ESPERA)
+        self.falhas = 0
+        self.scanner.scan([EXECUTAVEL])
+
+    def ciclo(self):
+        self.backend.aguardar()
+        self.scanner.scan([EXECUTAVEL])
+        self.backend.observar_pids(self.scanner.identidades_de(EXECUTAVEL))
+
+    def esperar_estado(self, rodando: bool, limite: float) -> float:
+        """Roda ciclos até esta_rodando == rodando; devolve a latência (ou inf se passou do limite)."""
+        inicio = time.monotonic()
+        while self.scanner.esta_rodando(EXECUTAVEL) != rodando:
+            if time.monotonic() - inicio > limite:
+                return float("inf")
+            self.ciclo()
+        return time.monotonic() - inicio
+
+    def conferir(self, rotulo: str, ok: bool, detalhe: str):
+        print(f"{'OK' if ok else 'FALHA':5} {rotulo}: {detalhe}")
+        if not ok:
+            self.falhas += 1
+
+    def iniciar_depois(self, atraso: float, colher: bool) -> dict:
+        estado = {}
+        def _iniciar():
+            estado["proc"] = proc = subprocess.Popen([self.binario, "60"])
+            if colher:
+                threading.Thread(target=proc.wait, daemon=True).start()
+        threading.Timer(atraso, _iniciar).start()
+        return estado
+
+    def caso(self, rotulo: str, colher: bool):
+        estado = self.iniciar_depois(0.2, colher)
+        latencia = self.esperar_estado(True, ESPERA + 2) - 0.2
+        limite = LIMITE_EVENTO if self.backend.tem_eventos_de_inicio else ESPERA + 1
+        self.conferir(f"{rotulo}: início", latencia < limite,
+                      f"{latencia:.2f} s ({'proc connector' if self.backend.tem_eventos_de_inicio else 'polling, sem CAP_NET_ADMIN'})")
+        proc = estado["proc"]
+
+        threading.Timer(0.2, proc.kill).start()
+        latencia = self.esperar_estado(False, ESPERA + 2) - 0.2
+        self.conferir(f"{rotulo}: fim", latencia < LIMITE_EVENTO, f"{latencia:.2f} s após o kill (pidfd)")
+
+        if not colher:
+            zumbi = psutil.Process(proc.pid).status() == psutil.STATUS_ZOMBIE
+            self.conferir(f"{rotulo}: processo ainda é zumbi", zumbi, "pai não colheu")
+            # Identidade velha (scanner atrasado) não pode rearmar um pidfd que já disparou
+            identidade = (proc.pid, psutil.Process(proc.pid).create_time())
+            ciclos, inicio = 0, time.monotonic()
+            while time.monotonic() - inicio < 1.0:
+                self.backend.observar_pids({identidade})
+                self.backend.aguardar(0.25)
+                ciclos += 1
+            self.conferir(f"{rotulo}: loop não gira com o zumbi", ciclos <= 6, f"{ciclos} ciclos em 1 s")
+            self.conferir(f"{rotulo}: nenhum pidfd aberto", not self.backend._pidfds, str(list(self.backend._pidfds)))
+            proc.wait()
+
+    def fechar(self):
+        self.backend.fechar()
+
+
+def main() -> int:
+    if not sys.platform.startswith("linux") or not hasattr(os, "pidfd_open"):
+        print("Só para Linux com os.pidfd_open (Python 3.9+, kernel 5.3+).")
+        return 2
+    sleep = shutil.which("sleep")
+    if sleep is None:
+        print("Binário `sleep` não encontrado.")
+        return 2
+    with tempfile.TemporaryDirectory() as pasta:
+        binario = os.path.join(pasta, EXECUTAVEL)
+        shutil.copy(sleep, binario)
+        checagem = Checagem(binario)
+        try:
+            checagem.caso("fim normal", colher=True)
+            checagem.caso("zumbi", colher=False)
+        finally:
+            checagem.fechar()
+    return 1 if checagem.falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
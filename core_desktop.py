@@ -3,17 +3,39 @@ import subprocess
 import webbrowser
 import os
 import string
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Dict, Optional
 
-from thefuzz import fuzz
 import pygetwindow as gw
 import keyboard
 import pyautogui
 
-from core_utils import log_interface, carregar_config_apps, expandir_caminho
+from core_utils import log_interface, carregar_config_apps, expandir_caminho, versao_config_apps
+from core_matcher import catalog_matcher
+from core_screen import template_matcher
 
-def abrir_app_desktop(nome_app: str):
+def _capturar_tela(regiao=None):
+    """Uma captura por verificação, compartilhada por todas as imagens buscadas nela (None sem OpenCV)."""
+    if not template_matcher.is_available:
+        return None
+    return template_matcher.capturar(regiao)
+
+def _localizar_imagem(frame, image_file: str, confidence: float, regiao=None):
+    if frame is None:
+        return pyautogui.locateCenterOnScreen(image_file, confidence=confidence, region=tuple(regiao) if regiao else None)
+    return template_matcher.localizar(frame, template_matcher.carregar(image_file), confidence)
+
+def _aguardar(cancel_event: Optional[threading.Event], segundos: float) -> bool:
+    """Espera `segundos`; retorna True se a automação foi cancelada nesse meio tempo."""
+    if cancel_event is None:
+        time.sleep(segundos)
+        return False
+    return cancel_event.wait(segundos)
+
+def abrir_app_desktop(nome_app: str, cancel_event: Optional[threading.Event] = None):
     dados = carregar_config_apps()
     app_info = dados.get("apps_locais", {}).get(nome_app.lower())
     
@@ -37,19 +59,23 @@ def abrir_app_desktop(nome_app: str):
         if "launcher_steps" in app_info:
             log_interface(f"[DESKTOP] Executando automação de launcher para {nome_app}...", "info")
             for step in app_info["launcher_steps"]:
-                
+                if cancel_event is not None and cancel_event.is_set():
+                    log_interface(f"[DESKTOP] Automação de launcher de '{nome_app}' cancelada.", "warning")
+                    return
+
                 action_name = step.get("action")
 
                 if action_name == "wait_for_button_state_change":
                     timeout = step.get("delay", 120)
                     image_ready_file = step.get("image_ready")
                     image_gray_file = step.get("image_gray")
+                    regiao = step.get("region")
                     
                     if not os.path.exists(image_ready_file) or not os.path.exists(image_gray_file):
                         log_interface(f"[DESKTOP] ERRO: Imagem para automação não encontrada. Verifique '{image_ready_file}' e '{image_gray_file}'.", "error")
                         return
 
-                    confidence_level = 0.95
+                    confidence_level = step.get("confidence", 0.95)
                     log_interface(f"[DESKTOP] Aguardando o botão ficar ativo por até {timeout}s...", "info")
                     
                     start_time = time.time()
@@ -57,14 +83,15 @@ def abrir_app_desktop(nome_app: str):
                     
                     while time.time() - start_time < timeout:
                         try:
-                            ready_location = pyautogui.locateCenterOnScreen(image_ready_file, confidence=confidence_level)
+                            frame = _capturar_tela(regiao)
+                            ready_location = _localizar_imagem(frame, image_ready_file, confidence_level, regiao)
                             if ready_location:
                                 log_interface("[DESKTOP] Botão 'Start' está pronto! Clicando...", "success")
                                 pyautogui.click(ready_location)
                                 clicked = True
                                 break
 
-                            gray_location = pyautogui.locateCenterOnScreen(image_gray_file, confidence=confidence_level)
+                            gray_location = _localizar_imagem(frame, image_gray_file, confidence_level, regiao)
                             if gray_location:
                                 log_interface("[DESKTOP] Launcher ainda está carregando (botão cinza visível)...", "info")
                         
@@ -73,8 +100,11 @@ def abrir_app_desktop(nome_app: str):
                         except Exception as e:
                             log_interface(f"[DESKTOP] Erro inesperado na busca de imagem: {e}", "warning")
                             
-                        time.sleep(2)
+                        if _aguardar(cancel_event, 2):
+                            break
 
+                    if not clicked and cancel_event is not None and cancel_event.is_set():
+                        continue
                     if not clicked:
                         log_interface(f"[DESKTOP] ERRO: O botão 'Start' não ficou ativo após {timeout}s.", "error")
                 
@@ -82,6 +112,7 @@ def abrir_app_desktop(nome_app: str):
                     image_to_click = step.get("image_to_click")
                     timeout = step.get("delay", 60)
                     confidence = step.get("confidence", 0.95)
+                    regiao = step.get("region")
                     
                     if not os.path.exists(image_to_click):
                         log_interface(f"[DESKTOP] ERRO: Imagem para automação não encontrada. Verifique '{image_to_click}'.", "error")
@@ -94,7 +125,7 @@ def abrir_app_desktop(nome_app: str):
                     
                     while time.time() - start_time < timeout:
                         try:
-                            location = pyautogui.locateCenterOnScreen(image_to_click, confidence=confidence)
+                            location = _localizar_imagem(_capturar_tela(regiao), image_to_click, confidence, regiao)
                             if location:
                                 # **Nova lógica para mover e clicar**
                                 log_interface(f"[DESKTOP] Imagem '{image_to_click}' encontrada. Movendo o mouse e clicando...", "info")
@@ -105,9 +136,14 @@ def abrir_app_desktop(nome_app: str):
                                 break
                         except pyautogui.PyAutoGUIException:
                             pass
+                        except Exception as e:
+                            log_interface(f"[DESKTOP] Erro inesperado na busca de imagem: {e}", "warning")
                         
-                        time.sleep(1)
+                        if _aguardar(cancel_event, 1):
+                            break
 
+                    if not clicked and cancel_event is not None and cancel_event.is_set():
+                        continue
                     if not clicked:
                         log_interface(f"[DESKTOP] ERRO: Não foi possível clicar no botão '{image_to_click}' após {timeout}s.", "error")
 
@@ -168,45 +204,111 @@ def extrair_palavra_chave(comando: str) -> str:
     palavras_chave = [p for p in palavras if p not in palavras_ignoradas]
     return " ".join(palavras_chave) if palavras_chave else ""
 
-def interpretar_comando_desktop(comando: str):
+PALAVRAS_ABRIR = ["abrir", "iniciar", "executar", "jogar", "rodar", "abra", "inicia", "execute", "joga", "rode"]
+PALAVRAS_FECHAR = ["fechar", "encerrar", "terminar", "matar", "fecha", "encerra", "termina", "mata"]
+
+def _resolver_comando_desktop(comando: str):
     comando_lower = comando.lower()
-    dados = carregar_config_apps()
-    palavras_abrir = ["abrir", "iniciar", "executar", "jogar", "rodar", "abra", "inicia", "execute", "joga", "rode"]
-    palavras_fechar = ["fechar", "encerrar", "terminar", "matar", "fecha", "encerra", "termina", "mata"]
 
     termo_alvo = extrair_palavra_chave(comando)
     if not termo_alvo:
         return None
 
-    best_match_score = 0
-    best_match_app = None
-    best_match_type = None
-
-    for apelido, detalhes in dados.get("apps_locais", {}).items():
-        nomes_possiveis = [apelido] + detalhes.get("sinonimos", [])
-        for nome in nomes_possiveis:
-            score = fuzz.token_set_ratio(termo_alvo, nome)
-            if score > best_match_score:
-                best_match_score = score
-                best_match_app = apelido
-                best_match_type = "app"
-
-    if any(palavra in comando_lower for palavra in palavras_abrir):
-        for apelido in dados.get("sites_conhecidos", {}).keys():
-            score = fuzz.token_set_ratio(termo_alvo, apelido)
-            if score > best_match_score:
-                best_match_score = score
-                best_match_app = apelido
-                best_match_type = "site"
+    quer_abrir = any(palavra in comando_lower for palavra in PALAVRAS_ABRIR)
+    best_match_score, best_match_app, best_match_type = catalog_matcher.melhor_correspondencia(termo_alvo, incluir_sites=quer_abrir)
 
     if best_match_score > 75:
-        if any(palavra in comando_lower for palavra in palavras_fechar) and best_match_type == "app":
+        if any(palavra in comando_lower for palavra in PALAVRAS_FECHAR) and best_match_type == "app":
             return {"funcao": "fechar_app", "parametros": {"nome": best_match_app}}
         
-        if any(palavra in comando_lower for palavra in palavras_abrir):
+        if quer_abrir:
             if best_match_type == "app":
                 return {"funcao": "abrir_app", "parametros": {"nome": best_match_app}}
             elif best_match_type == "site":
                 return {"funcao": "abrir_site", "parametros": {"nome": best_match_app}}
     
-    return None
\ No newline at end of file
+    return None
+
+class IntentCache:
+    """
+    LRU de comando normalizado -> intenção resolvida (ou None), válido para uma versão do apps.json.
+    Qualquer mudança no catálogo (sinônimo aprendido, app adicionado/excluído) troca a versão e
+    esvazia o cache na próxima consulta.
+    """
+    def __init__(self, max_entradas: int = 256):
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[str, Optional[Dict]]" = OrderedDict()
+        self._versao = None
+
+    @staticmethod
+    def normalizar(comando: str) -> str:
+        return " ".join(comando.lower().split())
+
+    def resolver(self, comando: str, versao: int, resolver_fn) -> Optional[Dict]:
+        chave = self.normalizar(comando)
+        with self._lock:
+            if versao != self._versao:
+                self._entradas.clear()
+                self._versao = versao
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.hits += 1
+                return self._copiar(self._entradas[chave])
+            self.misses += 1
+
+        resultado = resolver_fn(chave)
+
+        with self._lock:
+            if versao == self._versao:
+                self._entradas[chave] = resultado
+                self._entradas.move_to_end(chave)
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+        return self._copiar(resultado)
+
+    @staticmethod
+    def _copiar(intencao: Optional[Dict]) -> Optional[Dict]:
+        if intencao is None:
+            return None
+        return {**intencao, "parametros": dict(intencao.get("parametros", {}))}
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._versao = None
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entradas": len(self._entradas), "versao": self._versao}
+
+
+intent_cache = IntentCache()
+# Transcrições parciais da voz ("abr", "abrir st", "abrir ste"...) quase nunca se repetem como comando:
+# ficam num cache próprio e pequeno para não expulsar do intent_cache os comandos de verdade
+intent_cache_parcial = IntentCache(max_entradas=32)
+
+def interpretar_comando_desktop(comando: str, cache: IntentCache = intent_cache):
+    return cache.resolver(comando, versao_config_apps(), _resolver_comando_desktop)
+
+def avaliar_comando_desktop(comando: str, cache: IntentCache = intent_cache) -> Optional[Dict]:
+    """
+    Intenção de interpretar_comando_desktop acompanhada da confiança, para decidir se ela dispensa
+    confirmação: {"intencao": {...}, "score": 0-100, "margem": score do melhor - score do segundo nome
+    mais parecido (100 se não houver outro)}. None se o comando não vira intenção.
+    """
+    intencao = interpretar_comando_desktop(comando, cache)
+    if intencao is None:
+        return None
+    quer_abrir = any(palavra in comando.lower() for palavra in PALAVRAS_ABRIR)
+    ranking = catalog_matcher.ranking(extrair_palavra_chave(comando), incluir_sites=quer_abrir, n=2)
+    if not ranking:
+        return None
+    score = ranking[0][0]
+    margem = score - ranking[1][0] if len(ranking) > 1 else 100
+    return {"intencao": intencao, "score": score, "margem": margem}
+
+def estatisticas_cache_intencoes() -> Dict:
+    return intent_cache.estatisticas()
\ No newline at end of file
@@ -0,0 +1,229 @@
+# core_matcher.py
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from thefuzz import fuzz, utils as fuzz_utils
+
+from core_utils import carregar_config_apps, versao_config_apps
+
+# Posição de cada nome na ordem de varredura original de interpretar_comando_desktop:
+# (0, índice_do_app, índice_do_nome) para apps e (1, índice_do_site, 0) para sites.
+# Comparar posições reproduz o desempate "primeiro que atingir o maior score vence".
+Posicao = Tuple[int, int, int]
+
+TIPO_APP = 0
+TIPO_SITE = 1
+
+
+def normalizar(texto: str) -> str:
+    """Mesmo pré-processamento que o fuzz.token_set_ratio aplica (ascii, minúsculas, só alfanuméricos)."""
+    return fuzz_utils.full_process(texto, force_ascii=True)
+
+
+def _trigramas(texto_normalizado: str) -> Set[str]:
+    grams = set()
+    for token in texto_normalizado.split():
+        padded = f"  {token} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def _chave_exata(texto_normalizado: str) -> str:
+    return " ".join(sorted(set(texto_normalizado.split())))
+
+
+class CatalogMatcher:
+    """
+    Índice invertido de trigramas sobre os apelidos/sinônimos de apps e sites do apps.json.
+    - candidatos: só os nomes que compartilham algum trigrama com o termo recebem fuzz.token_set_ratio
+    - atalho exato: nome com o mesmo conjunto de tokens do termo vale 100 sem pontuar nada depois dele
+    - sincronizado de forma incremental a cada nova versão do apps.json (sinônimo aprendido, app
+      adicionado/excluído), sem reconstruir o índice inteiro
+    - ranking() faz a varredura completa, mas guarda o resultado por termo normalizado até a próxima versão
+    """
+    MAX_RANKINGS = 256
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._versao = None
+        self._rankings: "OrderedDict[Tuple[str, bool, int], List[Tuple[int, str, str]]]" = OrderedDict()
+        self._limpar()
+
+    def _limpar(self):
+        self._entradas: Dict[Posicao, Tuple[str, str]] = {}
+        self._postings: Dict[str, Set[Posicao]] = {}
+        self._exatos: Dict[str, Set[Posicao]] = {}
+        self._apps: Dict[str, Tuple[int, Tuple[str, ...]]] = {}
+        self._sites: Dict[str, int] = {}
+        self._proximo_app = 0
+        self._proximo_site = 0
+
+    # --- manutenção do índice ---
+
+    def _adicionar(self, pos: Posicao, nome: str, apelido: str):
+        nome_norm = normalizar(nome)
+        self._entradas[pos] = (nome_norm, apelido)
+        for grama in _trigramas(nome_norm):
+            self._postings.setdefault(grama, set()).add(pos)
+        if nome_norm:
+            self._exatos.setdefault(_chave_exata(nome_norm), set()).add(pos)
+
+    def _remover(self, pos: Posicao):
+        entrada = self._entradas.pop(pos, None)
+        if entrada is None:
+            return
+        nome_norm = entrada[0]
+        for grama in _trigramas(nome_norm):
+            postings = self._postings.get(grama)
+            if postings is not None:
+                postings.discard(pos)
+                if not postings:
+                    del self._postings[grama]
+        if nome_norm:
+            chave = _chave_exata(nome_norm)
+            exatos = self._exatos.get(chave)
+            if exatos is not None:
+                exatos.discard(pos)
+                if not exatos:
+                    del self._exatos[chave]
+
+    def _ordem_preservada(self, apps: Mapping, sites: Mapping) -> bool:
+        indices_apps = [self._apps[a][0] for a in apps if a in self._apps]
+        indices_sites = [self._sites[s] for s in sites if s in self._sites]
+        return indices_apps == sorted(indices_apps) and indices_sites == sorted(indices_sites)
+
+    def sincronizar(self, dados: Mapping):
+        """Aplica ao índice apenas a diferença entre o catálogo indexado e `dados`."""
+        with self._lock:
+            self._rankings.clear()
+            apps = dados.get("apps_locais", {})
+            sites = dados.get("sites_conhecidos", {})
+
+            if not self._ordem_preservada(apps, sites):
+                self._limpar()
+
+            for apelido in [a for a in self._apps if a not in apps]:
+                idx, nomes = self._apps.pop(apelido)
+                for j in range(len(nomes)):
+                    self._remover((TIPO_APP, idx, j))
+
+            for apelido, detalhes in apps.items():
+                nomes = (apelido, *detalhes.get("sinonimos", ()))
+                antigo = self._apps.get(apelido)
+                if antigo is None:
+                    idx, inicio = self._proximo_app, 0
+                    self._proximo_app += 1
+                elif antigo[1] == nomes:
+                    continue
+                elif nomes[:len(antigo[1])] == antigo[1]:
+                    # Caso comum: sinônimo aprendido foi anexado ao fim da lista
+                    idx, inicio = antigo[0], len(antigo[1])
+                else:
+                    idx, inicio = antigo[0], 0
+                    for j in range(len(antigo[1])):
+                        self._remover((TIPO_APP, idx, j))
+                for j in range(inicio, len(nomes)):
+                    self._adicionar((TIPO_APP, idx, j), nomes[j], apelido)
+                self._apps[apelido] = (idx, nomes)
+
+            for apelido in [s for s in self._sites if s not in sites]:
+                self._remover((TIPO_SITE, self._sites.pop(apelido), 0))
+
+            for apelido in sites:
+                if apelido not in self._sites:
+                    self._sites[apelido] = self._proximo_site
+                    self._proximo_site += 1
+                    self._adicionar((TIPO_SITE, self._sites[apelido], 0), apelido, apelido)
+
+    def atualizar(self):
+        """Sincroniza com o apps.json se a versão do ConfigStore mudou desde a última consulta."""
+        versao = versao_config_apps()
+        if versao != self._versao:
+            with self._lock:
+                self.sincronizar(carregar_config_apps())
+                self._versao = versao
+
+    # --- consulta ---
+
+    def _candidatos(self, termo_norm: str, tipos: Iterable[int]) -> List[Posicao]:
+        tipos = set(tipos)
+        limite = None
+        exatos = [p for p in self._exatos.get(_chave_exata(termo_norm), ()) if p[0] in tipos]
+        if exatos:
+            limite = min(exatos)
+
+        candidatos = set()
+        for grama in _trigramas(termo_norm):
+            for pos in self._postings.get(grama, ()):
+                if pos[0] in tipos and (limite is None or pos < limite):
+                    candidatos.add(pos)
+        if limite is not None:
+            candidatos.add(limite)
+        return sorted(candidatos)
+
+    def melhor_correspondencia(self, termo: str, incluir_sites: bool = False) -> Tuple[int, Optional[str], Optional[str]]:
+        """
+        Retorna (score, apelido, tipo) com tipo "app" ou "site", igual à varredura completa
+        com fuzz.token_set_ratio (sites só entram se `incluir_sites`).
+        """
+        self.atualizar()
+        termo_norm = normalizar(termo)
+        if not termo_norm:
+            return 0, None, None
+
+        tipos = (TIPO_APP, TIPO_SITE) if incluir_sites else (TIPO_APP,)
+        best_score, best_pos = 0, None
+        with self._lock:
+            for pos in self._candidatos(termo_norm, tipos):
+                score = fuzz.token_set_ratio(termo_norm, self._entradas[pos][0], full_process=False)
+                if score > best_score:
+                    best_score, best_pos = score, pos
+                    if score == 100:
+                        break
+            if best_pos is None:
+                return 0, None, None
+            tipo = "app" if best_pos[0] == TIPO_APP else "site"
+            return best_score, self._entradas[best_pos][1], tipo
+
+    def ranking(self, termo: str, incluir_sites: bool = False, n: int = 2) -> List[Tuple[int, str, str]]:
+        """
+        Os `n` apelidos distintos mais parecidos com o termo, como (score, apelido, tipo), do maior score
+        para o menor (empates na ordem do catálogo). Serve para medir se uma correspondência é ambígua.
+        Pontua todos os nomes, sem o filtro de trigramas: o segundo colocado pode ter score baixo
+        (nomes sem trigrama em comum chegam a 75) e a margem entre os dois precisa ser exata.
+        Como a varredura custa O(catálogo), o resultado fica em cache por (termo normalizado, versão):
+        as transcrições parciais da voz repetem o mesmo texto muitas vezes.
+        """
+        self.atualizar()
+        termo_norm = normalizar(termo)
+        if not termo_norm:
+            return []
+
+        chave_cache = (" ".join(termo_norm.split()), incluir_sites, n)
+        with self._lock:
+            if chave_cache in self._rankings:
+                self._rankings.move_to_end(chave_cache)
+                return list(self._rankings[chave_cache])
+
+        tipos = {TIPO_APP, TIPO_SITE} if incluir_sites else {TIPO_APP}
+        melhores: Dict[Tuple[int, str], Tuple[int, Posicao]] = {}
+        with self._lock:
+            for pos, (nome_norm, apelido) in self._entradas.items():
+                if pos[0] not in tipos:
+                    continue
+                score = fuzz.token_set_ratio(termo_norm, nome_norm, full_process=False)
+                chave = (pos[0], apelido)
+                atual = melhores.get(chave)
+                if atual is None or (-score, pos) < (-atual[0], atual[1]):
+                    melhores[chave] = (score, pos)
+            ordenados = sorted(melhores.items(), key=lambda item: (-item[1][0], item[1][1]))
+            resultado = [(score, apelido, "app" if tipo == TIPO_APP else "site") for (tipo, apelido), (score, _) in ordenados[:n]]
+            self._rankings[chave_cache] = resultado
+            while len(self._rankings) > self.MAX_RANKINGS:
+                self._rankings.popitem(last=False)
+        return list(resultado)
+
+
+catalog_matcher = CatalogMatcher()
@@ -1,16 +1,319 @@
 # core_monitor.py
+import os
+import select
+import socket
+import struct
+import sys
 import threading
 import time
-from typing import Callable
-from core_utils import carregar_config_apps
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from core_utils import carregar_config_apps, carregar_config_geral, assinar_config_apps, versao_config_apps, update_status
 
 try:
     import psutil
 except ImportError:
     psutil = None
 
+class ProcessScanner:
+    """
+    Visão incremental dos processos em execução.
+    - cache pid -> (create_time, nome em minúsculas); a cada scan só os pids novos são consultados
+    - erros de um processo (sumiu, acesso negado) afetam só aquele pid, nunca o scan inteiro
+    - índice nome do executável -> pids para responder "está rodando?" em O(1)
+    - zumbis (encerrados mas ainda não colhidos pelo pai) contam como encerrados
+    """
+    def __init__(self):
+        self._cache: Dict[int, Tuple[float, Optional[str]]] = {}
+        self._por_nome: Dict[str, Set[int]] = {}
+
+    def _indexar(self, pid: int, create_time: float, nome: Optional[str]):
+        self._cache[pid] = (create_time, nome)
+        if nome:
+            self._por_nome.setdefault(nome, set()).add(pid)
+
+    def _esquecer(self, pid: int):
+        _, nome = self._cache.pop(pid, (None, None))
+        if nome and nome in self._por_nome:
+            self._por_nome[nome].discard(pid)
+            if not self._por_nome[nome]:
+                del self._por_nome[nome]
+
+    def _consultar(self, pid: int):
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                create_time = proc.create_time()
+                try:
+                    # Zumbi fica no cache sem nome: não conta como rodando e não é reconsultado
+                    nome = None if proc.status() == psutil.STATUS_ZOMBIE else proc.name().lower()
+                except psutil.AccessDenied:
+                    nome = None
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return
+        except psutil.AccessDenied:
+            # Processo protegido: guarda sem nome para não reconsultá-lo a cada ciclo
+            create_time, nome = 0.0, None
+        self._indexar(pid, create_time, nome)
+
+    def scan(self, vigiados: Iterable[str] = ()) -> Tuple[Set[int], Set[int]]:
+        """Atualiza o cache e retorna (pids novos, pids encerrados)."""
+        atuais = set(psutil.pids())
+        conhecidos = set(self._cache)
+        encerrados = conhecidos - atuais
+        novos = atuais - conhecidos
+
+        # PID reaproveitado pelo SO entre dois scans (rápido no Windows): vale para qualquer pid do cache,
+        # já que um pid de processo comum pode passar a ser o de um jogo. create_time é uma syscall barata.
+        for pid in atuais & conhecidos:
+            criado = self._cache[pid][0]
+            if not criado:
+                continue  # protegido (AccessDenied): sem create_time para comparar
+            try:
+                if psutil.Process(pid).create_time() != criado:
+                    encerrados.add(pid)
+                    novos.add(pid)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                encerrados.add(pid)
+            except psutil.AccessDenied:
+                pass
+
+        for nome in vigiados:
+            for pid in list(self._por_nome.get(nome, ())):
+                if pid in encerrados:
+                    continue
+                try:
+                    if psutil.Process(pid).status() == psutil.STATUS_ZOMBIE:
+                        encerrados.add(pid)
+                except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                    encerrados.add(pid)
+
+        for pid in encerrados:
+            self._esquecer(pid)
+        for pid in novos:
+            self._consultar(pid)
+        return novos, encerrados
+
+    def esta_rodando(self, executavel: str) -> bool:
+        return bool(self._por_nome.get(executavel.lower()))
+
+    def pids_de(self, executavel: str) -> Set[int]:
+        return set(self._por_nome.get(executavel.lower(), ()))
+
+    def identidades_de(self, executavel: str) -> Set[Tuple[int, float]]:
+        """(pid, create_time) dos processos do executável: identifica o processo mesmo com PID reaproveitado."""
+        return {(pid, self._cache[pid][0]) for pid in self._por_nome.get(executavel.lower(), ())}
+
+
+class PollingBackend:
+    """
+    Backend de detecção por polling com intervalo adaptativo: volta ao mínimo quando a tabela
+    de processos muda (ex.: um launcher abrindo) e cresce até o máximo enquanto tudo está parado.
+    """
+    nome = "polling"
+
+    def __init__(self, intervalo_min: float = 0.5, intervalo_max: float = 4.0, fator: float = 1.5):
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.fator = fator
+        self.intervalo = intervalo_min
+        self._acordar = threading.Event()
+
+    def registrar_scan(self, houve_mudanca: bool):
+        if houve_mudanca:
+            self.intervalo = self.intervalo_min
+        else:
+            self.intervalo = min(self.intervalo_max, self.intervalo * self.fator)
+
+    def observar_pids(self, processos: Set[Tuple[int, float]]):
+        pass
+
+    def aguardar(self, timeout_max: Optional[float] = None):
+        timeout = self.intervalo if timeout_max is None else max(0.0, min(self.intervalo, timeout_max))
+        self._acordar.wait(timeout)
+        self._acordar.clear()
+
+    def acordar(self):
+        self._acordar.set()
+
+    def fechar(self):
+        pass
+
+
+class LinuxEventBackend(PollingBackend):
+    """
+    Backend orientado a eventos para Linux.
+    - saída: pidfd (os.pidfd_open) de cada processo de jogo detectado, sem privilégios
+    - início: proc connector (netlink) acorda o monitor a cada exec; exige CAP_NET_ADMIN, e sem ele
+      o polling adaptativo continua cobrindo o surgimento de processos
+    """
+    nome = "linux-eventos"
+
+    NETLINK_CONNECTOR = 11
+    CN_IDX_PROC = 1
+    CN_VAL_PROC = 1
+    PROC_CN_MCAST_LISTEN = 1
+    PROC_CN_MCAST_IGNORE = 2
+    PROC_EVENT_EXEC = 0x00000002
+    PROC_EVENT_EXIT = 0x80000000
+    JANELA_AGRUPAMENTO = 0.05  # segundos para juntar rajadas de exec num único scan
+
+    def __init__(self, intervalo_min: float = 0.5, intervalo_max: float = 4.0, fator: float = 1.5,
+                 intervalo_max_com_eventos: float = 30.0):
+        super().__init__(intervalo_min, intervalo_max, fator)
+        self._poller = select.poll()
+        self._pipe_r, self._pipe_w = os.pipe()
+        os.set_blocking(self._pipe_r, False)
+        os.set_blocking(self._pipe_w, False)
+        self._poller.register(self._pipe_r, select.POLLIN)
+        self._pidfds: Dict[int, int] = {}
+        self._identidades: Dict[int, Tuple[int, float]] = {}
+        self._disparados: Set[Tuple[int, float]] = set()
+        self._netlink = self._abrir_proc_connector()
+        if self._netlink is not None:
+            self._poller.register(self._netlink.fileno(), select.POLLIN)
+            # Com eventos de exec o polling vira só uma rede de segurança
+            self.intervalo_max = intervalo_max_com_eventos
+
+    @property
+    def tem_eventos_de_inicio(self) -> bool:
+        return self._netlink is not None
+
+    def _mensagem_proc_connector(self, op: int) -> bytes:
+        payload = struct.pack("=I", op)
+        cn_msg = struct.pack("=IIIIHH", self.CN_IDX_PROC, self.CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+        nlmsghdr = struct.pack("=IHHII", 16 + len(cn_msg), 3, 0, 0, os.getpid())  # 3 = NLMSG_DONE
+        return nlmsghdr + cn_msg
+
+    def _abrir_proc_connector(self) -> Optional[socket.socket]:
+        sock = None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, self.NETLINK_CONNECTOR)
+            sock.bind((0, self.CN_IDX_PROC))
+            sock.send(self._mensagem_proc_connector(self.PROC_CN_MCAST_LISTEN))
+            sock.setblocking(False)
+            return sock
+        except (OSError, AttributeError):
+            if sock is not None:
+                sock.close()
+            return None
+
+    def _ler_proc_connector(self) -> bool:
+        """Esvazia o socket; retorna True se chegou algum exec/exit."""
+        relevante = False
+        while True:
+            try:
+                dados = self._netlink.recv(4096)
+            except (BlockingIOError, InterruptedError):
+                return relevante
+            except OSError:
+                return True  # ENOBUFS: eventos perdidos, melhor reescanear
+            offset = 0
+            while offset + 16 <= len(dados):
+                tamanho = struct.unpack_from("=I", dados, offset)[0]
+                if tamanho < 16:
+                    break
+                # nlmsghdr (16) + cn_msg (20) + proc_event.what (4)
+                if offset + 40 <= len(dados):
+                    what = struct.unpack_from("=I", dados, offset + 36)[0]
+                    if what in (self.PROC_EVENT_EXEC, self.PROC_EVENT_EXIT):
+                        relevante = True
+                offset += (tamanho + 3) & ~3
+
+    def observar_pids(self, processos: Set[Tuple[int, float]]):
+        """
+        processos: (pid, create_time) a vigiar. Um pidfd que já disparou não é reaberto para o mesmo
+        processo (ele continuaria legível para sempre enquanto o processo for zumbi).
+        """
+        processos = set(processos)
+        self._disparados &= processos
+        for pid in [p for p, ident in self._identidades.items() if ident not in processos]:
+            self._fechar_pidfd(pid)
+        for ident in processos:
+            pid = ident[0]
+            if pid in self._pidfds or ident in self._disparados:
+                continue
+            try:
+                fd = os.pidfd_open(pid)
+            except OSError:
+                continue
+            self._pidfds[pid] = fd
+            self._identidades[pid] = ident
+            self._poller.register(fd, select.POLLIN)
+
+    def _fechar_pidfd(self, pid: int):
+        self._identidades.pop(pid, None)
+        fd = self._pidfds.pop(pid, None)
+        if fd is not None:
+            try:
+                self._poller.unregister(fd)
+            except (KeyError, ValueError):
+                pass
+            os.close(fd)
+
+    def aguardar(self, timeout_max: Optional[float] = None):
+        timeout = self.intervalo if timeout_max is None else max(0.0, min(self.intervalo, timeout_max))
+        fim = time.monotonic() + timeout
+        acordou = False
+        while not acordou:
+            restante = fim - time.monotonic()
+            if restante <= 0:
+                return
+            for fd, _ in self._poller.poll(restante * 1000):
+                if fd == self._pipe_r:
+                    try:
+                        while os.read(self._pipe_r, 64):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    acordou = True
+                elif self._netlink is not None and fd == self._netlink.fileno():
+                    if self._ler_proc_connector():
+                        acordou = True
+                else:
+                    pid = next((p for p, f in self._pidfds.items() if f == fd), None)
+                    if pid is not None:
+                        self._disparados.add(self._identidades[pid])
+                        self._fechar_pidfd(pid)
+                    acordou = True
+        if self._netlink is not None:
+            time.sleep(self.JANELA_AGRUPAMENTO)
+            self._ler_proc_connector()
+
+    def acordar(self):
+        try:
+            os.write(self._pipe_w, b"x")
+        except (BlockingIOError, OSError):
+            pass
+
+    def fechar(self):
+        for pid in list(self._pidfds):
+            self._fechar_pidfd(pid)
+        if self._netlink is not None:
+            try:
+                self._netlink.send(self._mensagem_proc_connector(self.PROC_CN_MCAST_IGNORE))
+            except OSError:
+                pass
+            self._netlink.close()
+            self._netlink = None
+        for fd in (self._pipe_r, self._pipe_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def criar_backend_deteccao(preferencia: str = "auto") -> PollingBackend:
+    """"auto"/"eventos" usam LinuxEventBackend quando possível; qualquer outro valor força polling."""
+    if preferencia in ("auto", "eventos") and sys.platform.startswith("linux") and hasattr(os, "pidfd_open"):
+        try:
+            return LinuxEventBackend()
+        except OSError:
+            pass
+    return PollingBackend()
+
+
 class PCMonitor:
-    def __init__(self, log_fn: Callable, on_game_focused: Callable, on_game_unfocused: Callable):
+    def __init__(self, log_fn: Callable, on_game_focused: Callable, on_game_unfocused: Callable, backend: Optional[PollingBackend] = None):
         if not psutil:
             self.is_available = False
             return
@@ -31,22 +334,53 @@ class PCMonitor:
         self.time_game_disappeared = 0
         self.GRACE_PERIOD_SECONDS = 10 # Vai esperar 10 segundos antes de esconder o overlay
 
-        config = carregar_config_apps()
-        self.game_executables = {details.get("executavel", "").lower(): apelido
-                                 for apelido, details in config.get("apps_locais", {}).items() 
-                                 if details.get("executavel")}
+        self._scanner = ProcessScanner()
+        self._backend = backend or criar_backend_deteccao(carregar_config_geral().get("monitor_backend", "auto"))
+        self._backend_fechado = False
+
+        # Jogos em execução, na ordem em que foram detectados; o último é o active_game_name
+        self.running_games: List[str] = []
+
+        # Índice executável -> apelido, trocado inteiro (nunca editado) quando o apps.json muda
+        self._catalogo_lock = threading.Lock()
+        self._versao_catalogo = versao_config_apps()
+        self.game_executables = self._indexar_executaveis(carregar_config_apps())
+        assinar_config_apps(self._on_catalogo_alterado)
+
+    @staticmethod
+    def _indexar_executaveis(config: Mapping) -> Dict[str, str]:
+        return {details.get("executavel", "").lower(): apelido
+                for apelido, details in config.get("apps_locais", {}).items()
+                if details.get("executavel")}
+
+    def _on_catalogo_alterado(self, config: Mapping, versao: int):
+        with self._catalogo_lock:
+            if versao <= self._versao_catalogo:
+                return
+            self._versao_catalogo = versao
+            novo_indice = self._indexar_executaveis(config)
+            if novo_indice == self.game_executables:
+                return
+            self.game_executables = novo_indice
+        self.log_fn(f"[MONITOR] Lista de jogos monitorados atualizada ({len(novo_indice)} executáveis).", "info")
+        if self.is_running:
+            self._backend.acordar()
 
     def start(self):
         if not self.is_available or self.is_running: return
+        if self._backend_fechado:
+            self._backend = criar_backend_deteccao(carregar_config_geral().get("monitor_backend", "auto"))
+            self._backend_fechado = False
         self.is_running = True
         self._stop_event.clear()
         self._thread = threading.Thread(target=self._run, daemon=True, name="PCMonitorThread")
         self._thread.start()
-        self.log_fn("Módulo de Monitoramento iniciado.", "info")
+        self.log_fn(f"Módulo de Monitoramento iniciado (detecção: {self._backend.nome}).", "info")
 
     def stop(self):
         if not self.is_available or not self.is_running: return
         self._stop_event.set()
+        self._backend.acordar()
         if self._thread: self._thread.join(timeout=2.0)
         self.is_running = False
         self.log_fn("Módulo de Monitoramento parado.", "info")
@@ -54,27 +388,40 @@ class PCMonitor:
     def _run(self):
         while not self._stop_event.is_set():
             try:
-                running_processes = {p.name().lower() for p in psutil.process_iter(['name'])}
+                # Pega mudanças feitas à mão no apps.json (stat no máximo 1x/s; assinantes são avisados)
+                versao_config_apps()
+                game_executables = self.game_executables
+
+                novos, encerrados = self._scanner.scan(game_executables)
+                self._backend.registrar_scan(bool(novos or encerrados))
                 
-                game_found = False
-                found_game_name = None
+                em_execucao = []
+                for game_exe, apelido in game_executables.items():
+                    if apelido not in em_execucao and self._scanner.esta_rodando(game_exe):
+                        em_execucao.append(apelido)
 
-                for game_exe, apelido in self.game_executables.items():
-                    if game_exe in running_processes:
-                        game_found = True
-                        found_game_name = apelido
-                        break
+                iniciados = [apelido for apelido in em_execucao if apelido not in self.running_games]
+                finalizados = [apelido for apelido in self.running_games if apelido not in em_execucao]
+                self.running_games = [apelido for apelido in self.running_games if apelido in em_execucao] + iniciados
 
                 # --- LÓGICA DE PACIÊNCIA IMPLEMENTADA ---
-                if game_found:
+                if self.running_games:
                     # Se um jogo foi encontrado, cancela qualquer período de espera
                     self.in_grace_period = False
+                    for apelido in finalizados:
+                        self.log_fn(f"[MONITOR] Jogo '{apelido}' fechado; ainda em execução: {', '.join(self.running_games)}.", "desktop")
                     
+                    if self.active_game_name != self.running_games[-1]:
+                        self.active_game_name = self.running_games[-1]
+                        update_status("jogando", self.active_game_name)
+
                     if not self.game_is_active:
-                        self.log_fn(f"[MONITOR] Jogo '{found_game_name}' detectado! Mostrando overlay.", "desktop")
-                        self.active_game_name = found_game_name
+                        self.log_fn(f"[MONITOR] Jogo '{self.active_game_name}' detectado! Mostrando overlay.", "desktop")
                         self.on_game_focused()
                         self.game_is_active = True
+                    else:
+                        for apelido in iniciados:
+                            self.log_fn(f"[MONITOR] Jogo '{apelido}' detectado.", "desktop")
                 else: # Nenhum jogo foi encontrado
                     if self.game_is_active and not self.in_grace_period:
                         # O jogo acabou de desaparecer. Inicia o período de tolerância.
@@ -87,13 +434,24 @@ class PCMonitor:
                         if time.time() - self.time_game_disappeared > self.GRACE_PERIOD_SECONDS:
                             self.log_fn("[MONITOR] Período de tolerância esgotado. Jogo realmente fechado. Escondendo overlay.", "desktop")
                             self.active_game_name = None
+                            update_status("padrao", None)
                             self.on_game_unfocused()
                             self.game_is_active = False
                             self.in_grace_period = False
 
+                # Saída dos jogos em execução acorda o monitor na hora (pidfd no Linux)
+                self._backend.observar_pids({ident for game_exe in game_executables for ident in self._scanner.identidades_de(game_exe)})
+
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                 pass
             except Exception as e:
                 self.log_fn(f"[MONITOR] Erro inesperado: {e}", "error")
 
-            time.sleep(2) # Verifica a cada 2 segundos
\ No newline at end of file
+            timeout_max = None
+            if self.in_grace_period:
+                # Acorda exatamente quando o período de tolerância esgota, em vez de ficar consultando
+                timeout_max = self.GRACE_PERIOD_SECONDS - (time.time() - self.time_game_disappeared) + 0.05
+            self._backend.aguardar(timeout_max)
+
+        self._backend.fechar()
+        self._backend_fechado = True
\ No newline at end of file
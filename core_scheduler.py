@@ -0,0 +1,101 @@
+# core_scheduler.py
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Dict, Set, Tuple
+
+from core_utils import log_interface
+
+# Prioridades dentro de uma lane (menor = atendido primeiro)
+PRIORIDADE_ALTA = 0
+PRIORIDADE_NORMAL = 1
+
+
+class Lane:
+    """Fila própria com um consumidor: comandos de uma lane rodam em ordem, sem esperar as outras."""
+    def __init__(self, nome: str, handler: Callable[[str], Awaitable[None]]):
+        self.nome = nome
+        self.handler = handler
+        self.queue: "asyncio.PriorityQueue[Tuple[int, int, str]]" = asyncio.PriorityQueue()
+        self.task = None
+
+
+class CommandScheduler:
+    """
+    Distribui comandos do bot_main em lanes independentes (ex.: navegador, desktop, mídia).
+    - roteador: callable(comando) -> (nome_da_lane, prioridade)
+    - trabalho bloqueante vai para um pool de threads (executar_bloqueante), fora do event loop
+    - jobs longos podem ser cancelados: recebem um threading.Event `cancel_event` (cancelar_jobs)
+    """
+    def __init__(self, roteador: Callable[[str], Tuple[str, int]], max_workers: int = 4):
+        self.roteador = roteador
+        self.lanes: Dict[str, Lane] = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AssistenteWorker")
+        self._seq = itertools.count()
+        self._cancel_events: Set[threading.Event] = set()
+        self._jobs: Set[asyncio.Task] = set()
+
+    def registrar_lane(self, nome: str, handler: Callable[[str], Awaitable[None]]):
+        self.lanes[nome] = Lane(nome, handler)
+
+    def start(self):
+        for lane in self.lanes.values():
+            if lane.task is None:
+                lane.task = asyncio.create_task(self._worker(lane), name=f"lane-{lane.nome}")
+
+    async def submeter(self, comando: str):
+        nome_lane, prioridade = self.roteador(comando)
+        lane = self.lanes.get(nome_lane)
+        if lane is None:
+            log_interface(f"[SCHEDULER] Lane '{nome_lane}' desconhecida para o comando '{comando}'.", "error")
+            return
+        await lane.queue.put((prioridade, next(self._seq), comando))
+
+    async def _worker(self, lane: Lane):
+        while True:
+            _, _, comando = await lane.queue.get()
+            try:
+                await lane.handler(comando)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_interface(f"[SCHEDULER] Erro na lane '{lane.nome}' ao executar '{comando}': {e}", "error")
+            finally:
+                lane.queue.task_done()
+
+    async def executar_bloqueante(self, fn: Callable, *args, cancelavel: bool = False):
+        """Roda fn(*args) no pool de threads. Se `cancelavel`, fn recebe cancel_event=threading.Event()."""
+        loop = asyncio.get_running_loop()
+        if not cancelavel:
+            return await loop.run_in_executor(self.executor, partial(fn, *args))
+
+        cancel_event = threading.Event()
+        self._cancel_events.add(cancel_event)
+        try:
+            return await loop.run_in_executor(self.executor, partial(fn, *args, cancel_event=cancel_event))
+        finally:
+            self._cancel_events.discard(cancel_event)
+
+    def disparar(self, coro: Awaitable) -> asyncio.Task:
+        """Agenda um job em segundo plano sem segurar a lane (ex.: automação de launcher)."""
+        task = asyncio.ensure_future(coro)
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+        return task
+
+    def cancelar_jobs(self) -> int:
+        """Sinaliza cancelamento a todos os jobs bloqueantes canceláveis em andamento."""
+        eventos = list(self._cancel_events)
+        for evento in eventos:
+            evento.set()
+        return len(eventos)
+
+    async def stop(self):
+        self.cancelar_jobs()
+        tasks = [lane.task for lane in self.lanes.values() if lane.task] + list(self._jobs)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,146 @@
+# core_screen.py
+import os
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+    np = None
+
+import pyautogui
+
+Regiao = Tuple[int, int, int, int]  # (left, top, width, height), mesmo formato do pyautogui
+
+
+class Template:
+    """Imagem de referência carregada uma única vez, em tons de cinza, com os níveis da pirâmide já reduzidos."""
+    def __init__(self, path: str, escalas: Sequence[float]):
+        self.path = path
+        dados = np.fromfile(path, dtype=np.uint8)
+        self.gray = cv2.imdecode(dados, cv2.IMREAD_GRAYSCALE)
+        if self.gray is None:
+            raise ValueError(f"Não foi possível decodificar a imagem '{path}'.")
+        self.niveis: Dict[float, "np.ndarray"] = {1.0: self.gray}
+        h, w = self.gray.shape
+        for escala in escalas:
+            if escala < 1.0:
+                self.niveis[escala] = cv2.resize(self.gray, (max(1, int(w * escala)), max(1, int(h * escala))), interpolation=cv2.INTER_AREA)
+
+    @property
+    def tamanho(self) -> Tuple[int, int]:
+        h, w = self.gray.shape
+        return w, h
+
+
+class Frame:
+    """Uma captura de tela em tons de cinza, compartilhada por todos os templates de uma mesma verificação."""
+    def __init__(self, gray: "np.ndarray", regiao: Optional[Regiao]):
+        self.gray = gray
+        self.offset = (regiao[0], regiao[1]) if regiao else (0, 0)
+        self._niveis: Dict[float, "np.ndarray"] = {1.0: gray}
+
+    def nivel(self, escala: float) -> "np.ndarray":
+        if escala not in self._niveis:
+            h, w = self.gray.shape
+            self._niveis[escala] = cv2.resize(self.gray, (max(1, int(w * escala)), max(1, int(h * escala))), interpolation=cv2.INTER_AREA)
+        return self._niveis[escala]
+
+
+class TemplateMatcher:
+    """
+    Busca de imagens na tela para as automações de launcher_steps.
+    - templates carregados e reduzidos uma vez (cache por caminho + mtime)
+    - uma captura por verificação (capturar), reaproveitada por vários templates (localizar)
+    - busca grosseira na menor escala em que o lado menor do template ainda tem `tamanho_minimo` px,
+      e confirmação em resolução cheia ao redor dos `picos` melhores candidatos
+    - se nenhum candidato confirmar, uma busca em resolução cheia no frame inteiro decide: a escala
+      reduzida só acelera, nunca recusa um template que o pyautogui encontraria
+    """
+    def __init__(self, escalas: Sequence[float] = (0.25, 0.5, 0.75), tamanho_minimo: int = 24, margem_grosseira: float = 0.2,
+                 picos: int = 3):
+        self.escalas = tuple(sorted(escalas))
+        self.tamanho_minimo = tamanho_minimo
+        self.margem_grosseira = margem_grosseira
+        self.picos = picos
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Tuple[float, Template]] = {}
+
+    @property
+    def is_available(self) -> bool:
+        return cv2 is not None
+
+    def carregar(self, path: str) -> Template:
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cache = self._templates.get(path)
+            if cache and cache[0] == mtime:
+                return cache[1]
+            template = Template(path, self.escalas)
+            self._templates[path] = (mtime, template)
+            return template
+
+    def capturar(self, regiao: Optional[Regiao] = None) -> Frame:
+        imagem = pyautogui.screenshot(region=tuple(regiao) if regiao else None)
+        gray = cv2.cvtColor(np.asarray(imagem), cv2.COLOR_RGB2GRAY)
+        return Frame(gray, regiao)
+
+    def _escala_grosseira(self, template: Template) -> float:
+        w, h = template.tamanho
+        for escala in self.escalas:
+            if escala < 1.0 and min(w, h) * escala >= self.tamanho_minimo:
+                return escala
+        return 1.0
+
+    def localizar(self, frame: Frame, template: Template, confidence: float = 0.95) -> Optional[Tuple[int, int]]:
+        """Retorna o centro (x, y) do template na tela, ou None se o score ficar abaixo de `confidence`."""
+        w, h = template.tamanho
+        fh, fw = frame.gray.shape
+        if w > fw or h > fh:
+            return None
+
+        escala = self._escala_grosseira(template)
+        nivel_frame = frame.nivel(escala) if escala < 1.0 else None
+        if nivel_frame is not None and (nivel_frame.shape[0] < template.niveis[escala].shape[0] or nivel_frame.shape[1] < template.niveis[escala].shape[1]):
+            escala = 1.0
+        if escala < 1.0:
+            for loc in self._picos_grosseiros(nivel_frame, template.niveis[escala], confidence - self.margem_grosseira):
+                # Refina em resolução cheia numa janela pequena ao redor do candidato
+                folga = int(2 / escala) + 2
+                x0 = max(0, int(loc[0] / escala) - folga)
+                y0 = max(0, int(loc[1] / escala) - folga)
+                x1 = min(fw, int(loc[0] / escala) + w + folga)
+                y1 = min(fh, int(loc[1] / escala) + h + folga)
+                achado = self._confirmar(frame, template, confidence, x0, y0, frame.gray[y0:y1, x0:x1])
+                if achado is not None:
+                    return achado
+        return self._confirmar(frame, template, confidence, 0, 0, frame.gray)
+
+    def _picos_grosseiros(self, nivel_frame: "np.ndarray", nivel_template: "np.ndarray", minimo: float):
+        """Até `picos` máximos locais acima de `minimo`, do melhor para o pior (supressão de vizinhança)."""
+        res = cv2.matchTemplate(nivel_frame, nivel_template, cv2.TM_CCOEFF_NORMED)
+        th, tw = nivel_template.shape
+        picos = []
+        for _ in range(self.picos):
+            _, score, _, loc = cv2.minMaxLoc(res)
+            if score < minimo:
+                break
+            picos.append(loc)
+            res[max(0, loc[1] - th // 2):loc[1] + th // 2 + 1, max(0, loc[0] - tw // 2):loc[0] + tw // 2 + 1] = -1.0
+        return picos
+
+    def _confirmar(self, frame: Frame, template: Template, confidence: float, x0: int, y0: int,
+                   janela: "np.ndarray") -> Optional[Tuple[int, int]]:
+        w, h = template.tamanho
+        if janela.shape[0] < h or janela.shape[1] < w:
+            return None
+        res = cv2.matchTemplate(janela, template.gray, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(res)
+        if score < confidence:
+            return None
+        return (frame.offset[0] + x0 + loc[0] + w // 2, frame.offset[1] + y0 + loc[1] + h // 2)
+
+
+template_matcher = TemplateMatcher()
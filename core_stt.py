@@ -0,0 +1,215 @@
+# core_stt.py
+import json
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Type
+
+import speech_recognition as sr
+
+from core_utils import CONFIG_DIR, expandir_caminho, log_interface
+
+
+class RecognitionSession:
+    """
+    Uma frase em reconhecimento. aceitar(pcm) recebe o áudio cru (mono, 16 bits) à medida que ele é
+    capturado e pode devolver a transcrição parcial até ali; finalizar() devolve o texto final ou
+    levanta sr.UnknownValueError (nada reconhecido) / sr.RequestError (falha do serviço/modelo).
+    """
+    def __init__(self, sample_rate: int, sample_width: int):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self._partes: List[bytes] = []
+
+    @property
+    def segundos_de_audio(self) -> float:
+        return sum(len(p) for p in self._partes) / float(self.sample_rate * self.sample_width)
+
+    def aceitar(self, pcm: bytes) -> Optional[str]:
+        self._partes.append(pcm)
+        return None
+
+    def audio(self) -> sr.AudioData:
+        return sr.AudioData(b"".join(self._partes), self.sample_rate, self.sample_width)
+
+    def finalizar(self) -> str:
+        raise NotImplementedError
+
+
+class SpeechRecognizerBackend:
+    """
+    Interface dos reconhecedores do VoiceManager.
+    - carregar(): chamado uma única vez, fora do caminho da fala (modelos locais demoram a abrir)
+    - nova_sessao(): uma RecognitionSession por frase
+    - streaming: True quando a sessão decodifica durante a captura (parciais + finalização rápida)
+    """
+    nome = "base"
+    offline = False
+    streaming = False
+
+    def __init__(self, idioma: str = "pt-BR"):
+        self.idioma = idioma
+
+    def carregar(self):
+        pass
+
+    def nova_sessao(self, sample_rate: int, sample_width: int) -> RecognitionSession:
+        raise NotImplementedError
+
+
+class _GoogleSession(RecognitionSession):
+    def __init__(self, backend: "GoogleRecognizer", sample_rate: int, sample_width: int):
+        super().__init__(sample_rate, sample_width)
+        self.backend = backend
+
+    def finalizar(self) -> str:
+        return self.backend.recognizer.recognize_google(self.audio(), language=self.backend.idioma)
+
+
+class GoogleRecognizer(SpeechRecognizerBackend):
+    """Web Speech API do Google (comportamento original): exige rede e só decodifica no fim da frase."""
+    nome = "google"
+
+    def __init__(self, idioma: str = "pt-BR"):
+        super().__init__(idioma)
+        self.recognizer = sr.Recognizer()
+
+    def nova_sessao(self, sample_rate: int, sample_width: int) -> RecognitionSession:
+        return _GoogleSession(self, sample_rate, sample_width)
+
+
+class _VoskSession(RecognitionSession):
+    def __init__(self, backend: "VoskRecognizer", sample_rate: int, sample_width: int):
+        super().__init__(sample_rate, sample_width)
+        self._rec = backend.vosk.KaldiRecognizer(backend.model, sample_rate)
+        self._segmentos: List[str] = []
+
+    def aceitar(self, pcm: bytes) -> Optional[str]:
+        super().aceitar(pcm)
+        if self._rec.AcceptWaveform(pcm):
+            # O Vosk fecha um segmento numa pausa curta no meio da frase; a frase continua
+            texto = json.loads(self._rec.Result()).get("text", "")
+            if texto:
+                self._segmentos.append(texto)
+            parcial = ""
+        else:
+            parcial = json.loads(self._rec.PartialResult()).get("partial", "")
+        return " ".join(self._segmentos + [parcial]).strip() or None
+
+    def finalizar(self) -> str:
+        texto = json.loads(self._rec.FinalResult()).get("text", "")
+        texto = " ".join(self._segmentos + [texto]).strip()
+        if not texto:
+            raise sr.UnknownValueError()
+        return texto
+
+
+class VoskRecognizer(SpeechRecognizerBackend):
+    """
+    Vosk/Kaldi local e em streaming: cada pedaço de áudio é decodificado assim que chega, então a
+    transcrição fica pronta praticamente junto com o fim da fala. Modelo pequeno em português:
+    vosk-model-small-pt-0.3 (https://alphacephei.com/vosk/models), descompactado em `model_path`.
+    Caminho relativo é resolvido a partir da pasta do app, não do diretório de onde ele foi iniciado.
+    """
+    nome = "vosk"
+    offline = True
+    streaming = True
+
+    def __init__(self, model_path: str = "modelos/vosk-model-small-pt-0.3", idioma: str = "pt-BR"):
+        super().__init__(idioma)
+        caminho = expandir_caminho(model_path)
+        self.model_path = str(caminho if caminho.is_absolute() else CONFIG_DIR / caminho)
+        self.model = None
+        self.vosk = None
+
+    def carregar(self):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("vosk não está instalado (pip install vosk).")
+        if not Path(self.model_path).is_dir():
+            raise RuntimeError(f"Modelo Vosk não encontrado em '{self.model_path}'.")
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(self.model_path)
+
+    def nova_sessao(self, sample_rate: int, sample_width: int) -> RecognitionSession:
+        if sample_width != 2:
+            raise ValueError("O Vosk espera áudio de 16 bits.")
+        return _VoskSession(self, sample_rate, sample_width)
+
+
+class _WhisperSession(RecognitionSession):
+    def __init__(self, backend: "WhisperRecognizer", sample_rate: int, sample_width: int):
+        super().__init__(sample_rate, sample_width)
+        self.backend = backend
+
+    def finalizar(self) -> str:
+        import numpy as np
+        pcm = self.audio().get_raw_data(convert_rate=16000, convert_width=2)
+        amostras = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        try:
+            segmentos, _ = self.backend.model.transcribe(amostras, language=self.backend.idioma.split("-")[0], beam_size=1)
+            texto = " ".join(s.text.strip() for s in segmentos).strip()
+        except Exception as e:
+            raise sr.RequestError(f"faster-whisper: {e}")
+        if not texto:
+            raise sr.UnknownValueError()
+        return texto
+
+
+class WhisperRecognizer(SpeechRecognizerBackend):
+    """
+    Whisper local via faster-whisper (CTranslate2, int8 na CPU). Mais preciso que o Vosk pequeno,
+    mas decodifica a frase inteira no fim; prefira os modelos "base"/"small" numa CPU sem GPU.
+    """
+    nome = "whisper"
+    offline = True
+
+    def __init__(self, modelo: str = "small", idioma: str = "pt-BR", compute_type: str = "int8"):
+        super().__init__(idioma)
+        self.modelo = modelo
+        self.compute_type = compute_type
+        self.model = None
+
+    def carregar(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("faster-whisper não está instalado (pip install faster-whisper).")
+        self.model = WhisperModel(self.modelo, device="cpu", compute_type=self.compute_type)
+
+    def nova_sessao(self, sample_rate: int, sample_width: int) -> RecognitionSession:
+        return _WhisperSession(self, sample_rate, sample_width)
+
+
+RECONHECEDORES: Dict[str, Type[SpeechRecognizerBackend]] = {
+    "google": GoogleRecognizer,
+    "vosk": VoskRecognizer,
+    "whisper": WhisperRecognizer,
+}
+
+def criar_reconhecedor(config: Mapping) -> SpeechRecognizerBackend:
+    """
+    Escolhe o reconhecedor pelo config.json:
+    - "voz_reconhecedor": "auto" (padrão: Vosk se o modelo estiver instalado, senão Google), "google", "vosk" ou "whisper"
+    - "voz_modelo_vosk": pasta do modelo Vosk; "voz_modelo_whisper": tamanho/pasta do modelo Whisper
+    Se o reconhecedor local não puder ser carregado, cai para o Google com um aviso no log.
+    """
+    nome = config.get("voz_reconhecedor", "auto")
+    if nome == "google":
+        return GoogleRecognizer()
+    if nome == "whisper":
+        backend = WhisperRecognizer(config.get("voz_modelo_whisper", "small"))
+    elif nome in ("vosk", "auto"):
+        backend = VoskRecognizer(config.get("voz_modelo_vosk", "modelos/vosk-model-small-pt-0.3"))
+    else:
+        log_interface(f"[VOZ] Reconhecedor '{nome}' desconhecido (use auto, {', '.join(RECONHECEDORES)}). Usando Google.", "warning")
+        return GoogleRecognizer()
+    try:
+        backend.carregar()
+        return backend
+    except Exception as e:
+        if nome == "auto":
+            log_interface(f"[VOZ] Reconhecimento local indisponível ({e}); usando Google.", "voz")
+        else:
+            log_interface(f"[VOZ] Não foi possível carregar o reconhecedor '{nome}': {e} Usando Google.", "warning")
+        return GoogleRecognizer()
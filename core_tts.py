@@ -0,0 +1,270 @@
+# core_tts.py
+import hashlib
+import os
+import queue
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import pyttsx3
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+from core_utils import CONFIG_DIR, log_interface
+
+TTS_CACHE_DIR = CONFIG_DIR / 'tts_cache'
+
+
+class AudioClip:
+    """Fala já sintetizada (PCM de um WAV), pronta para tocar."""
+    def __init__(self, rate: int, width: int, canais: int, pcm: bytes):
+        self.rate = rate
+        self.width = width
+        self.canais = canais
+        self.pcm = pcm
+
+    @property
+    def duracao(self) -> float:
+        return len(self.pcm) / float(self.rate * self.width * self.canais)
+
+    @classmethod
+    def de_wav(cls, path: Union[str, Path]) -> "AudioClip":
+        with wave.open(str(path), "rb") as w:
+            return cls(w.getframerate(), w.getsampwidth(), w.getnchannels(), w.readframes(w.getnframes()))
+
+    def salvar(self, path: Path):
+        """Grava de forma atômica, como write_json_file: outro processo nunca lê um WAV pela metade."""
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            with wave.open(tmp, "wb") as w:
+                w.setnchannels(self.canais)
+                w.setsampwidth(self.width)
+                w.setframerate(self.rate)
+                w.writeframes(self.pcm)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+class Fala:
+    """Uma fala enfileirada no TTSWorker; `terminou` é sinalizado no fim da reprodução ou na interrupção."""
+    def __init__(self, partes: Sequence[str], geracao: int):
+        self.partes = [p for p in partes if p]
+        self.texto = " ".join(self.partes)
+        self.geracao = geracao
+        self.terminou = threading.Event()
+        self.interrompida = False
+        self.clipes: List[Future] = []
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        return self.terminou.wait(timeout)
+
+
+class TTSWorker:
+    """
+    Fala em segundo plano: falar() enfileira e retorna na hora.
+    - síntese (pyttsx3 -> WAV) numa thread dona do motor; reprodução (PyAudio) em outra, em pedaços
+      de ~50 ms, o que permite interromper() no meio de uma frase
+    - uma fala é uma sequência de partes (ex.: "Você disse:", texto, "Está correto?"): as partes fixas
+      tocam do cache enquanto a parte dinâmica ainda está sendo sintetizada
+    - frases fixas são pré-sintetizadas na inicialização e guardadas em tts_cache/; dinâmicas ficam num LRU
+    Sem PyAudio, cai para say()/runAndWait() na thread de síntese (sem cache nem interrupção no meio da frase).
+    """
+    def __init__(self, frases_fixas: Sequence[str] = (), max_dinamicas: int = 32,
+                 voz_preferida: str = "brazil", pasta_cache: Path = TTS_CACHE_DIR):
+        self.max_dinamicas = max_dinamicas
+        self.voz_preferida = voz_preferida
+        self.pasta_cache = pasta_cache
+        self.disponivel = True
+
+        self._engine = None
+        self._voz_id = ""
+        self._lock = threading.Lock()
+        self._fixas: Dict[str, AudioClip] = {}
+        self._dinamicas: "OrderedDict[str, AudioClip]" = OrderedDict()
+        self._geracao = 0
+        self._fila: "queue.Queue[Optional[Fala]]" = queue.Queue()
+
+        self._pa = None
+        self._stream = None
+        self._formato = None
+
+        self._sintese = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TTSSynth")
+        self._sintese.submit(self._iniciar_motor)
+        for frase in frases_fixas:
+            self._sintese.submit(self._preparar_fixa, frase)
+        self._player = threading.Thread(target=self._run, daemon=True, name="TTSPlayer")
+        self._player.start()
+
+    # --- thread de síntese ---
+
+    def _iniciar_motor(self):
+        try:
+            self._engine = pyttsx3.init()
+            for voice in self._engine.getProperty('voices'):
+                if self.voz_preferida in voice.name.lower():
+                    self._engine.setProperty('voice', voice.id)
+                    break
+            self._voz_id = str(self._engine.getProperty('voice'))
+        except Exception as e:
+            log_interface(f"Erro ao inicializar o motor de TTS: {e}", "error")
+            self._engine = None
+            self.disponivel = False
+
+    def _sintetizar(self, texto: str) -> AudioClip:
+        if self._engine is None:
+            raise RuntimeError("motor de TTS indisponível")
+        fd, tmp = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self._engine.save_to_file(texto, tmp)
+            self._engine.runAndWait()
+            return AudioClip.de_wav(tmp)
+        finally:
+            os.remove(tmp)
+
+    def _preparar_fixa(self, frase: str):
+        chave = hashlib.sha1(f"{self._voz_id}|{frase}".encode("utf-8")).hexdigest()
+        path = self.pasta_cache / f"{chave}.wav"
+        try:
+            if path.exists():
+                clip = AudioClip.de_wav(path)
+            else:
+                clip = self._sintetizar(frase)
+                self.pasta_cache.mkdir(exist_ok=True)
+                clip.salvar(path)
+            with self._lock:
+                self._fixas[frase] = clip
+        except Exception as e:
+            log_interface(f"[TTS] Não foi possível pré-sintetizar '{frase}': {e}", "warning")
+
+    def _sintetizar_dinamica(self, texto: str) -> AudioClip:
+        with self._lock:
+            clip = self._fixas.get(texto) or self._dinamicas.get(texto)
+        if clip is None:
+            clip = self._sintetizar(texto)
+        with self._lock:
+            if texto not in self._fixas:
+                self._dinamicas[texto] = clip
+                self._dinamicas.move_to_end(texto)
+                while len(self._dinamicas) > self.max_dinamicas:
+                    self._dinamicas.popitem(last=False)
+        return clip
+
+    def _falar_direto(self, fala: Fala):
+        try:
+            if fala.geracao == self._geracao and self._engine is not None:
+                self._engine.say(fala.texto)
+                self._engine.runAndWait()
+        except Exception as e:
+            log_interface(f"Erro durante a fala do TTS: {e}", "error")
+        finally:
+            fala.terminou.set()
+
+    def _clipe(self, texto: str) -> Future:
+        with self._lock:
+            clip = self._fixas.get(texto)
+            if clip is None and texto in self._dinamicas:
+                self._dinamicas.move_to_end(texto)
+                clip = self._dinamicas[texto]
+        if clip is not None:
+            futuro = Future()
+            futuro.set_result(clip)
+            return futuro
+        return self._sintese.submit(self._sintetizar_dinamica, texto)
+
+    # --- API ---
+
+    def falar(self, partes: Union[str, Sequence[str]]) -> Fala:
+        """Enfileira a fala e retorna imediatamente; a síntese das partes novas começa na hora."""
+        with self._lock:
+            geracao = self._geracao
+        fala = Fala([partes] if isinstance(partes, str) else partes, geracao)
+        if pyaudio is None:
+            self._sintese.submit(self._falar_direto, fala)
+            return fala
+        fala.clipes = [self._clipe(p) for p in fala.partes]
+        self._fila.put(fala)
+        return fala
+
+    def interromper(self):
+        """Corta a fala atual (no próximo pedaço de ~50 ms) e descarta as enfileiradas."""
+        with self._lock:
+            self._geracao += 1
+        while True:
+            try:
+                fala = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if fala is not None:
+                fala.interrompida = True
+                fala.terminou.set()
+
+    def fechar(self):
+        self.interromper()
+        self._fila.put(None)
+        self._player.join(timeout=2.0)
+        self._sintese.shutdown(wait=False)
+
+    # --- thread de reprodução ---
+
+    def _abrir_stream(self, clip: AudioClip):
+        formato = (clip.rate, clip.width, clip.canais)
+        if self._stream is not None and formato == self._formato:
+            if self._stream.is_stopped():
+                self._stream.start_stream()
+            return
+        self._fechar_stream()
+        if self._pa is None:
+            self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(format=self._pa.get_format_from_width(clip.width), channels=clip.canais,
+                                     rate=clip.rate, output=True)
+        self._formato = formato
+
+    def _fechar_stream(self):
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+
+    def _tocar(self, clip: AudioClip, fala: Fala) -> bool:
+        self._abrir_stream(clip)
+        passo = int(clip.rate * 0.05) * clip.width * clip.canais
+        for i in range(0, len(clip.pcm), passo):
+            if fala.geracao != self._geracao:
+                return False
+            self._stream.write(clip.pcm[i:i + passo])
+        return True
+
+    def _run(self):
+        while True:
+            fala = self._fila.get()
+            if fala is None:
+                break
+            try:
+                for futuro in fala.clipes:
+                    if fala.geracao != self._geracao or not self._tocar(futuro.result(), fala):
+                        fala.interrompida = True
+                        break
+                if self._stream is not None:
+                    self._stream.stop_stream()  # espera o buffer da placa esvaziar antes de sinalizar o fim
+            except Exception as e:
+                log_interface(f"Erro durante a fala do TTS: {e}", "error")
+                self._fechar_stream()
+            finally:
+                fala.terminou.set()
+        self._fechar_stream()
+        if self._pa is not None:
+            self._pa.terminate()
@@ -1,8 +1,13 @@
 # core_utils.py
+import copy
 import json
 import os
 import queue
-from typing import Any, Dict
+import tempfile
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 from pathlib import Path
 
 CONFIG_DIR = Path(__file__).parent
@@ -31,34 +36,254 @@ def read_json_file(path: Path, default: Any):
         log_interface(f"[UTILS] Erro ao ler {path.name}: {e}", "error")
         return default
 
-def write_json_file(path: Path, data: Any):
+def write_json_file(path: Path, data: Any) -> bool:
+    """
+    Grava de forma atômica (arquivo temporário + rename): leitores nunca veem JSON pela metade.
+    Devolve False (já registrado no log) se a gravação falhou e o arquivo ficou como estava.
+    """
+    tmp_name = None
     try:
-        with open(path, 'w', encoding='utf-8') as f:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+            tmp_name = f.name
             json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_name, path)
+        return True
     except Exception as e:
         log_interface(f"[UTILS] Erro ao gravar {path.name}: {e}", "error")
+        if tmp_name and os.path.exists(tmp_name):
+            try: os.remove(tmp_name)
+            except OSError: pass
+        return False
 
 def expandir_caminho(caminho_str: str) -> Path:
     return Path(os.path.expandvars(caminho_str))
 
-def carregar_config_apps() -> Dict:
-    return read_json_file(APPS_JSON, {"_comment": "...", "apps_locais": {}, "sites_conhecidos": {}})
+def _congelar(valor: Any) -> Any:
+    """Converte dicts/listas do JSON em views somente-leitura (MappingProxyType/tuple)."""
+    if isinstance(valor, dict):
+        return MappingProxyType({k: _congelar(v) for k, v in valor.items()})
+    if isinstance(valor, list):
+        return tuple(_congelar(v) for v in valor)
+    return valor
 
-def carregar_config_geral() -> Dict:
-    return read_json_file(CONFIG_JSON, {"confirmar_comando_voz": True})
+class ConfigStore:
+    """
+    Cache em memória de um arquivo JSON de configuração, compartilhado pelo processo.
+    - get(): view somente-leitura, sem I/O enquanto o arquivo não mudar
+    - copia(): cópia mutável para edição; gravar de volta com salvar()
+    - version: cresce monotonicamente a cada recarga ou gravação
+    - assinar(callback): callback(view, version) a cada nova versão, fora do lock do store
+    O arquivo só é revalidado (mtime/tamanho) no máximo a cada `intervalo_revalidacao` segundos.
+    """
+    def __init__(self, path: Path, default: Dict, intervalo_revalidacao: float = 1.0):
+        self.path = path
+        self.default = default
+        self.intervalo_revalidacao = intervalo_revalidacao
+        self.version = 0
+
+        self._lock = threading.RLock()
+        self._data: Optional[Dict] = None
+        self._view: Optional[Mapping] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._ultima_verificacao = 0.0
+        self._assinantes: List[Callable[[Mapping, int], None]] = []
+        self._versao_notificada = 0
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _publicar(self, data: Dict, stamp: Optional[Tuple[int, int]]):
+        self._data = data
+        self._view = _congelar(data)
+        self._stamp = stamp
+        self.version += 1
+
+    def _revalidar(self, forcar: bool = False):
+        agora = time.monotonic()
+        if not forcar and self._view is not None and agora - self._ultima_verificacao < self.intervalo_revalidacao:
+            return
+        self._ultima_verificacao = agora
+        stamp = self._stat()
+        if self._view is not None and stamp == self._stamp:
+            return
+        data = read_json_file(self.path, copy.deepcopy(self.default))
+        self._publicar(data, self._stat())
+
+    def _notificar(self):
+        with self._lock:
+            if self.version == self._versao_notificada:
+                return
+            self._versao_notificada = self.version
+            view, versao, assinantes = self._view, self.version, list(self._assinantes)
+        for callback in assinantes:
+            try:
+                callback(view, versao)
+            except Exception as e:
+                log_interface(f"[UTILS] Erro em assinante de {self.path.name}: {e}", "error")
+
+    def assinar(self, callback: Callable[[Mapping, int], None]) -> Callable[[Mapping, int], None]:
+        with self._lock:
+            self._assinantes.append(callback)
+        return callback
+
+    def cancelar_assinatura(self, callback: Callable[[Mapping, int], None]):
+        with self._lock:
+            if callback in self._assinantes:
+                self._assinantes.remove(callback)
+
+    def get(self) -> Mapping:
+        with self._lock:
+            self._revalidar()
+            view = self._view
+        self._notificar()
+        return view
+
+    def copia(self) -> Dict:
+        with self._lock:
+            self._revalidar()
+            data = copy.deepcopy(self._data)
+        self._notificar()
+        return data
+
+    def salvar(self, data: Dict) -> bool:
+        """Grava e publica a nova versão. Se a gravação falhar, nada é publicado e devolve False."""
+        with self._lock:
+            if not write_json_file(self.path, data):
+                return False
+            self._publicar(copy.deepcopy(data), self._stat())
+            self._ultima_verificacao = time.monotonic()
+        self._notificar()
+        return True
+
+    def invalidar(self):
+        """Relê o disco imediatamente se o arquivo mudou (ex.: gravado por outro módulo ou editado à mão)."""
+        with self._lock:
+            self._revalidar(forcar=True)
+        self._notificar()
+
+apps_store = ConfigStore(APPS_JSON, {"_comment": "...", "apps_locais": {}, "sites_conhecidos": {}})
+config_store = ConfigStore(CONFIG_JSON, {"confirmar_comando_voz": True, "limiar_confianca_voz": 90, "web_num_resultados": 5, "web_perfil_rapido": False, "web_max_abas": 4, "web_pre_carregar": True, "web_backend": "playwright"})
+
+def carregar_config_apps() -> Mapping:
+    """View somente-leitura do apps.json. Para editar use copiar_config_apps() + salvar_config_apps()."""
+    return apps_store.get()
+
+def copiar_config_apps() -> Dict:
+    return apps_store.copia()
+
+def salvar_config_apps(dados: Dict) -> bool:
+    return apps_store.salvar(dados)
+
+def assinar_config_apps(callback: Callable[[Mapping, int], None]) -> Callable[[Mapping, int], None]:
+    """Registra callback(view, version) chamado a cada mudança do catálogo de apps."""
+    return apps_store.assinar(callback)
+
+def versao_config_apps() -> int:
+    apps_store.get()
+    return apps_store.version
+
+def carregar_config_geral() -> Mapping:
+    return config_store.get()
+
+def copiar_config_geral() -> Dict:
+    return config_store.copia()
+
+def salvar_config_geral(dados: Dict) -> bool:
+    return config_store.salvar(dados)
+
+class StatusBus:
+    """
+    Estado do assistente mantido em memória, com assinantes notificados a cada mudança.
+    - publicar(): só notifica/grava se algo mudou de fato
+    - assinar(callback): callback(status: dict) chamado na thread que publicou
+    - o status.json é gravado com debounce (`debounce` segundos) e de forma atômica
+    """
+    def __init__(self, path: Path, default: Dict, debounce: float = 0.5):
+        self.path = path
+        self.default = default
+        self.debounce = debounce
+
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._status: Optional[Dict] = None
+        self._assinantes: List[Callable[[Dict], None]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._sujo = False
+
+    def _carregar(self) -> Dict:
+        if self._status is None:
+            self._status = {**self.default, **read_json_file(self.path, dict(self.default))}
+        return self._status
+
+    def get(self) -> Dict:
+        with self._lock:
+            return dict(self._carregar())
+
+    def assinar(self, callback: Callable[[Dict], None]) -> Callable[[Dict], None]:
+        with self._lock:
+            self._assinantes.append(callback)
+        return callback
+
+    def cancelar_assinatura(self, callback: Callable[[Dict], None]):
+        with self._lock:
+            if callback in self._assinantes:
+                self._assinantes.remove(callback)
+
+    def publicar(self, **campos):
+        with self._lock:
+            atual = self._carregar()
+            novo = {**atual, **campos}
+            if novo == atual:
+                return
+            self._status = novo
+            self._sujo = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            assinantes = list(self._assinantes)
+            snapshot = dict(novo)
+
+        for callback in assinantes:
+            try:
+                callback(dict(snapshot))
+            except Exception as e:
+                log_interface(f"[UTILS] Erro em assinante de status: {e}", "error")
+
+    def flush(self):
+        """Grava imediatamente o status pendente (usado pelo debounce e no encerramento)."""
+        with self._io_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._sujo:
+                    return
+                self._sujo = False
+                snapshot = dict(self._status)
+            if not write_json_file(self.path, snapshot):
+                # Continua pendente: a próxima publicação (ou o flush do encerramento) tenta de novo
+                with self._lock:
+                    self._sujo = True
+
+status_bus = StatusBus(STATUS_JSON, {"estado": "padrao", "processo_ativo": None})
 
 def carregar_status() -> Dict:
-    return read_json_file(STATUS_JSON, {"estado": "padrao", "processo_ativo": None})
+    return status_bus.get()
 
 def update_status(estado: str = "padrao", processo_ativo: str = None):
-    write_json_file(STATUS_JSON, {"estado": estado, "processo_ativo": processo_ativo})
+    status_bus.publicar(estado=estado, processo_ativo=processo_ativo)
 
 def adicionar_sinonimo(apelido_app: str, novo_sinonimo: str):
     """Adiciona um novo sinônimo a um app existente no apps.json."""
     if not apelido_app or not novo_sinonimo:
         return
         
-    config = carregar_config_apps()
+    config = copiar_config_apps()
     
     if apelido_app in config["apps_locais"]:
         if "sinonimos" not in config["apps_locais"][apelido_app]:
@@ -66,8 +291,8 @@ def adicionar_sinonimo(apelido_app: str, novo_sinonimo: str):
         
         if novo_sinonimo.lower() not in config["apps_locais"][apelido_app]["sinonimos"]:
             config["apps_locais"][apelido_app]["sinonimos"].append(novo_sinonimo.lower())
-            write_json_file(APPS_JSON, config)
-            log_interface(f"Aprendi que '{novo_sinonimo}' é um apelido para '{apelido_app}'!", "success")
+            if salvar_config_apps(config):
+                log_interface(f"Aprendi que '{novo_sinonimo}' é um apelido para '{apelido_app}'!", "success")
         else:
             log_interface(f"Eu já sabia que '{novo_sinonimo}' era um apelido para '{apelido_app}'.", "info")
     else:
@@ -1,38 +1,826 @@
 # core_vigia.py
+import sys
 import threading
 import time
-from typing import Callable, Optional
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
 import cv2
+import numpy as np
+
+from core_utils import carregar_config_geral, copiar_config_geral, salvar_config_geral
+
+TOKEN_PAUSE = "__VIGIA_PAUSE__"
+TOKEN_RESUME = "__VIGIA_RESUME__"
+
+PERSON_CLASS_ID = 0  # "person" no COCO, primeira classe dos modelos YOLOv8
+
+
+def _importar_yolo():
+    # Import tardio: ultralytics puxa o torch inteiro, desnecessário quando o ONNX já está em cache
+    try:
+        from ultralytics import YOLO
+    except Exception:
+        return None
+    return YOLO
+
+
+class PersonDetector:
+    """
+    Interface dos detectores do Vigia: detectar(frame BGR) -> array (N, 5) com x1, y1, x2, y2, conf
+    das pessoas encontradas, em coordenadas do frame. Só a classe "person" é considerada.
+    """
+    nome = "base"
+
+    def __init__(self, model_path: str, imgsz: int = 320, conf: float = 0.4):
+        self.model_path = model_path
+        self.imgsz = imgsz
+        self.conf = conf
+
+    def carregar(self):
+        raise NotImplementedError
+
+    def detectar(self, frame) -> "np.ndarray":
+        raise NotImplementedError
+
+    @staticmethod
+    def vazio() -> "np.ndarray":
+        return np.zeros((0, 5), dtype=np.float32)
+
+
+class UltralyticsDetector(PersonDetector):
+    """YOLO via ultralytics/torch, restrito à classe person e ao tamanho de entrada escolhido."""
+    nome = "ultralytics"
+
+    def carregar(self):
+        YOLO = _importar_yolo()
+        if YOLO is None:
+            raise RuntimeError("ultralytics YOLO não disponível (instale ultralytics).")
+        self._model = YOLO(self.model_path)
+
+    def detectar(self, frame) -> "np.ndarray":
+        results = self._model(frame, classes=[PERSON_CLASS_ID], imgsz=self.imgsz, conf=self.conf, verbose=False)
+        if not results or not hasattr(results[0], "boxes"):
+            return self.vazio()
+        boxes = results[0].boxes
+        mask = boxes.cls.cpu().numpy() == PERSON_CLASS_ID
+        if not mask.any():
+            return self.vazio()
+        xyxy = boxes.xyxy.cpu().numpy()[mask]
+        conf = boxes.conf.cpu().numpy()[mask]
+        return np.hstack([xyxy, conf[:, None]]).astype(np.float32)
+
+
+class OnnxDetector(PersonDetector):
+    """
+    YOLOv8 exportado para ONNX e executado na CPU (onnxruntime, ou cv2.dnn se ele não estiver instalado).
+    O .onnx fica em cache ao lado do .pt (ex.: yolov8n_320.onnx); a exportação, feita uma única vez,
+    é o único momento em que ultralytics/torch são necessários.
+    """
+    nome = "onnx"
+
+    def __init__(self, model_path: str, imgsz: int = 320, conf: float = 0.4, iou: float = 0.45):
+        super().__init__(model_path, imgsz, conf)
+        self.iou = iou
+        self._session = None
+        self._net = None
+
+    @property
+    def onnx_path(self) -> Path:
+        path = Path(self.model_path)
+        if path.suffix == ".onnx":
+            return path
+        return path.with_name(f"{path.stem}_{self.imgsz}.onnx")
+
+    def _exportar(self):
+        YOLO = _importar_yolo()
+        if YOLO is None:
+            raise RuntimeError(f"'{self.onnx_path}' não existe e o ultralytics não está disponível para exportá-lo.")
+        exportado = Path(YOLO(self.model_path).export(format="onnx", imgsz=self.imgsz, dynamic=False, simplify=True))
+        if exportado != self.onnx_path:
+            exportado.replace(self.onnx_path)
+
+    def carregar(self):
+        if not self.onnx_path.exists():
+            self._exportar()
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            ort = None
+        if ort is not None:
+            opcoes = ort.SessionOptions()
+            opcoes.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._session = ort.InferenceSession(str(self.onnx_path), opcoes, providers=["CPUExecutionProvider"])
+            self._input_name = self._session.get_inputs()[0].name
+        else:
+            self._net = cv2.dnn.readNetFromONNX(str(self.onnx_path))
+            self._net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self._net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def _letterbox(self, frame) -> Tuple["np.ndarray", float, int, int]:
+        h, w = frame.shape[:2]
+        escala = min(self.imgsz / h, self.imgsz / w)
+        nw, nh = int(round(w * escala)), int(round(h * escala))
+        dx, dy = (self.imgsz - nw) // 2, (self.imgsz - nh) // 2
+        canvas = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        canvas[dy:dy + nh, dx:dx + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        return canvas, escala, dx, dy
+
+    def _inferir(self, blob) -> "np.ndarray":
+        if self._session is not None:
+            return self._session.run(None, {self._input_name: blob})[0]
+        self._net.setInput(blob)
+        return self._net.forward()
+
+    def detectar(self, frame) -> "np.ndarray":
+        canvas, escala, dx, dy = self._letterbox(frame)
+        blob = cv2.dnn.blobFromImage(canvas, 1 / 255.0, swapRB=True)
+        pred = self._inferir(blob)[0]  # (4 + n_classes, n_anchors)
+
+        # Só a linha de score da classe person interessa: filtro vetorizado, sem laço por caixa
+        scores = pred[4 + PERSON_CLASS_ID]
+        mask = scores >= self.conf
+        if not mask.any():
+            return self.vazio()
+        cx, cy, bw, bh = pred[0:4, mask]
+        scores = scores[mask]
+        caixas = np.stack([(cx - bw / 2 - dx) / escala, (cy - bh / 2 - dy) / escala, bw / escala, bh / escala], axis=1)
+
+        keep = np.array(cv2.dnn.NMSBoxes(caixas.tolist(), scores.tolist(), self.conf, self.iou), dtype=np.int64).reshape(-1)
+        caixas, scores = caixas[keep], scores[keep]
+        caixas[:, 2:4] += caixas[:, 0:2]  # x, y, w, h -> x1, y1, x2, y2
+        return np.hstack([caixas, scores[:, None]]).astype(np.float32)
+
+
+DETECTORES = {"onnx": OnnxDetector, "ultralytics": UltralyticsDetector}
+
+def criar_detector(backend: str = "auto", model_path: str = "yolov8n.pt", imgsz: int = 320, conf: float = 0.4,
+                   log_fn: Optional[Callable[[str, str], None]] = None) -> PersonDetector:
+    """
+    "auto" prefere ONNX na CPU e cai para ultralytics se o ONNX não puder ser carregado/exportado;
+    a queda é registrada em `log_fn` com o motivo, já que custa o ganho de velocidade do ONNX.
+    """
+    if backend in DETECTORES:
+        detector = DETECTORES[backend](model_path, imgsz=imgsz, conf=conf)
+        detector.carregar()
+        return detector
+    try:
+        detector = OnnxDetector(model_path, imgsz=imgsz, conf=conf)
+        detector.carregar()
+    except Exception as e:
+        log_fn = log_fn or (lambda msg, tag="info": print(f"{tag.upper()}: {msg}"))
+        log_fn(f"Detector ONNX indisponível ({type(e).__name__}: {e}); usando ultralytics (mais lento).", "warning")
+        detector = UltralyticsDetector(model_path, imgsz=imgsz, conf=conf)
+        detector.carregar()
+    return detector
+
+
+class MotionGate:
+    """
+    Filtro barato de movimento: compara uma miniatura em tons de cinza do frame atual com a do
+    último frame que passou pelo modelo. Sem mudança relevante, a inferência pode ser pulada.
+    """
+    def __init__(self, limiar: float = 4.0, tamanho: Tuple[int, int] = (64, 48)):
+        self.limiar = limiar
+        self.tamanho = tamanho
+        self._referencia = None
+        self._ultima = None
+
+    def mudou(self, frame) -> bool:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        self._ultima = cv2.resize(gray, self.tamanho, interpolation=cv2.INTER_AREA)
+        if self._referencia is None:
+            return True
+        return float(cv2.absdiff(self._ultima, self._referencia).mean()) >= self.limiar
+
+    def marcar_referencia(self):
+        """Chamado quando o frame avaliado em mudou() foi de fato inferido."""
+        self._referencia = self._ultima
+
+    def reset(self):
+        self._referencia = None
+        self._ultima = None
+
+
+class PresenceDebouncer:
+    """
+    Debounce temporal da presença: PAUSE após `min_no_person_seconds` contínuos sem pessoa,
+    RESUME após `min_person_seconds` contínuos com pessoa (só se a pausa foi do vigia).
+    Medido em segundos, o comportamento não muda quando a taxa de inferência muda.
+    """
+    def __init__(self, min_no_person_seconds: float, min_person_seconds: float):
+        self.min_no_person_seconds = min_no_person_seconds
+        self.min_person_seconds = min_person_seconds
+        self.observado: Optional[bool] = None
+        self.desde = 0.0
+        self.video_paused_by_vigia = False
+
+    def _limiar(self, presenca: bool) -> float:
+        return self.min_person_seconds if presenca else self.min_no_person_seconds
+
+    def estavel(self, agora: float) -> bool:
+        """True quando o estado observado já se manteve pelo tempo do seu debounce."""
+        return self.observado is not None and agora - self.desde >= self._limiar(self.observado)
+
+    def atualizar(self, person_detected: bool, agora: float) -> Optional[str]:
+        if person_detected != self.observado:
+            self.observado = person_detected
+            self.desde = agora
+        duracao = agora - self.desde
+        if not person_detected and duracao >= self.min_no_person_seconds and not self.video_paused_by_vigia:
+            self.video_paused_by_vigia = True
+            return TOKEN_PAUSE
+        if person_detected and duracao >= self.min_person_seconds and self.video_paused_by_vigia:
+            self.video_paused_by_vigia = False
+            return TOKEN_RESUME
+        return None
+
+    def reset(self):
+        self.observado = None
+        self.desde = 0.0
+        self.video_paused_by_vigia = False
+
+
+class LatestFrameBuffer:
+    """
+    Slot único com o frame mais recente: publicar() substitui o anterior (que é descartado se ninguém
+    o consumiu) e obter() espera por um frame mais novo que o último visto. O ndarray é repassado
+    sem cópia; quem publica não pode reutilizar o array depois (cap.read() sem destino já aloca um novo).
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self._consumido = 0
+        self.descartados = 0
+
+    def publicar(self, frame, timestamp: float):
+        with self._cond:
+            if self._seq > self._consumido:
+                self.descartados += 1
+            self._frame = frame
+            self._timestamp = timestamp
+            self._seq += 1
+            self._cond.notify_all()
+
+    def obter(self, ultimo_seq: int, timeout: float = 1.0):
+        """Retorna (frame, timestamp, seq) com seq > ultimo_seq, ou None se estourar o timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > ultimo_seq, timeout):
+                return None
+            self._consumido = self._seq
+            return self._frame, self._timestamp, self._seq
+
+    def limpar(self):
+        with self._cond:
+            self._frame = None
+            self._consumido = self._seq
+
+
+class CaptureThread:
+    """Lê a câmera continuamente numa thread própria, para o driver nunca acumular frames velhos."""
+    def __init__(self, cap, buffer: LatestFrameBuffer, log_fn: Callable[[str, str], None]):
+        self.cap = cap
+        self.buffer = buffer
+        self.log_fn = log_fn
+        self.capturados = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="VigiaCaptureThread")
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        falhas = 0
+        while not self._stop_event.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                falhas += 1
+                if falhas == 50:
+                    self.log_fn("Câmera não está entregando frames.", "warning")
+                time.sleep(0.1)
+                continue
+            falhas = 0
+            self.capturados += 1
+            self.buffer.publicar(frame, time.monotonic())
+
+
+class FrameSource:
+    """
+    Origem de frames do Vigia, com a mesma interface do cv2.VideoCapture usada pela CaptureThread:
+    read() -> (ok, frame BGR), isOpened() e release(). `fps` é 0 quando desconhecido.
+    """
+    nome = "base"
+    fps = 0.0
+
+    def read(self):
+        raise NotImplementedError
+
+    def isOpened(self) -> bool:
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """Webcam via cv2.VideoCapture (DirectShow no Windows), em 640x480."""
+    nome = "camera"
+
+    def __init__(self, index: int = 0, largura: int = 640, altura: int = 480):
+        self.index = index
+        try:
+            cap = cv2.VideoCapture(index, cv2.CAP_DSHOW if hasattr(cv2, "CAP_DSHOW") else 0)
+        except Exception:
+            cap = cv2.VideoCapture(index)
+        if not cap.isOpened():
+            raise RuntimeError(f"Não foi possível abrir a câmera index={index}")
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, largura)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, altura)
+        self._cap = cap
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    def read(self):
+        return self._cap.read()
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def release(self):
+        self._cap.release()
+
+
+class ReplaySource(FrameSource):
+    """
+    Base das origens gravadas (vídeo, diretório de imagens).
+    - tempo_real=True segura cada read() no ritmo de `fps`, como uma câmera faria; False entrega o mais rápido possível
+    - loop=True recomeça do início ao chegar ao fim; sem loop, isOpened() vira False quando os frames acabam
+    - timestamp: posição do último frame entregue em segundos de gravação (índice / fps), base do benchmark
+    """
+    def __init__(self, fps: float, tempo_real: bool = True, loop: bool = False):
+        self.fps = fps
+        self.tempo_real = tempo_real
+        self.loop = loop
+        self.entregues = 0
+        self._inicio = None
+        self._esgotado = False
+
+    @property
+    def timestamp(self) -> float:
+        return max(0, self.entregues - 1) / self.fps
+
+    def _proximo(self):
+        """Próximo frame da gravação ou None no fim."""
+        raise NotImplementedError
+
+    def _reiniciar(self):
+        raise NotImplementedError
+
+    def read(self):
+        if self._esgotado:
+            return False, None
+        frame = self._proximo()
+        if frame is None and self.loop and self.entregues:
+            self._reiniciar()
+            frame = self._proximo()
+        if frame is None:
+            self._esgotado = True
+            return False, None
+        if self.tempo_real:
+            if self._inicio is None:
+                self._inicio = time.monotonic()
+            espera = self._inicio + self.entregues / self.fps - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+        self.entregues += 1
+        return True, frame
+
+    def isOpened(self) -> bool:
+        return not self._esgotado
+
+
+class VideoFileSource(ReplaySource):
+    """Arquivo de vídeo decodificado pelo OpenCV; o fps vem do próprio arquivo."""
+    nome = "video"
+
+    def __init__(self, path: Union[str, Path], tempo_real: bool = True, loop: bool = False):
+        self.path = str(path)
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            raise RuntimeError(f"Não foi possível abrir o vídeo '{self.path}'")
+        super().__init__(self._cap.get(cv2.CAP_PROP_FPS) or 30.0, tempo_real, loop)
+        self.total_frames = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    def _proximo(self):
+        ok, frame = self._cap.read()
+        return frame if ok else None
+
+    def _reiniciar(self):
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        self._esgotado = True
+        self._cap.release()
+
+
+class ImageDirSource(ReplaySource):
+    """Diretório de imagens tocado em ordem alfabética a `fps` quadros por segundo."""
+    nome = "imagens"
+    EXTENSOES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+    def __init__(self, path: Union[str, Path], fps: float = 10.0, tempo_real: bool = True, loop: bool = False):
+        self.path = Path(path)
+        self.arquivos = sorted(a for a in self.path.iterdir() if a.suffix.lower() in self.EXTENSOES)
+        if not self.arquivos:
+            raise RuntimeError(f"Nenhuma imagem encontrada em '{self.path}'")
+        super().__init__(fps, tempo_real, loop)
+        self.total_frames = len(self.arquivos)
+        self._indice = 0
+
+    def _proximo(self):
+        while self._indice < len(self.arquivos):
+            arquivo = self.arquivos[self._indice]
+            self._indice += 1
+            # np.fromfile + imdecode aceita caminhos com acentos no Windows, ao contrário do cv2.imread
+            frame = cv2.imdecode(np.fromfile(str(arquivo), dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None:
+                return frame
+        return None
+
+    def _reiniciar(self):
+        self._indice = 0
+
+
+def criar_fonte(origem: Union[int, str, Path] = 0, tempo_real: bool = True, loop: bool = False) -> FrameSource:
+    """Índice (int ou "0") abre a câmera; diretório vira ImageDirSource; qualquer outro caminho, VideoFileSource."""
+    if isinstance(origem, int) or (isinstance(origem, str) and origem.isdigit()):
+        return CameraSource(int(origem))
+    caminho = Path(origem)
+    if caminho.is_dir():
+        return ImageDirSource(caminho, tempo_real=tempo_real, loop=loop)
+    if not caminho.exists():
+        raise RuntimeError(f"Origem de frames '{origem}' não encontrada.")
+    return VideoFileSource(caminho, tempo_real=tempo_real, loop=loop)
+
+
+def carregar_config_camera(chave: str) -> Mapping:
+    """Configuração da câmera/origem `chave` em config.json -> vigia_cameras (vazia se não houver)."""
+    return carregar_config_geral().get("vigia_cameras", {}).get(chave, {})
+
+def salvar_config_camera(chave: str, **campos):
+    config = copiar_config_geral()
+    cameras = config.setdefault("vigia_cameras", {})
+    atual = cameras.setdefault(chave, {})
+    if all(atual.get(k) == v for k, v in campos.items()):
+        return
+    atual.update(campos)
+    salvar_config_geral(config)
+
+
+class RoiSelector:
+    """
+    Recorte do frame que vai para o detector, em coordenadas normalizadas (x, y, largura, altura) de 0 a 1.
+    - fixo (roi=[...]): só a região configurada conta, ex.: a cadeira; o filtro de movimento também olha só ela
+    - auto: aprende a região das pessoas detectadas recentemente (com margem); se o recorte não acha
+      ninguém, o mesmo frame é conferido inteiro, para quem saiu da região não virar "ausência"
+    Recortes que cobririam quase o frame inteiro são ignorados (não economizam nada).
+    """
+    def __init__(self, roi: Optional[Tuple[float, float, float, float]] = None, auto: bool = False,
+                 margem: float = 0.25, tamanho_minimo: float = 0.3, historico: int = 20,
+                 cobertura_maxima: float = 0.8):
+        self.auto = auto
+        self.margem = margem
+        self.tamanho_minimo = tamanho_minimo
+        self.cobertura_maxima = cobertura_maxima
+        self._caixas = deque(maxlen=historico)
+        self.roi = self._validar(roi)
+
+    @staticmethod
+    def _validar(roi) -> Optional[Tuple[float, float, float, float]]:
+        if roi is None:
+            return None
+        x, y, w, h = (float(v) for v in roi)
+        x, y = min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+        w, h = min(w, 1.0 - x), min(h, 1.0 - y)
+        if w <= 0 or h <= 0:
+            return None
+        return (round(x, 4), round(y, 4), round(w, 4), round(h, 4))
+
+    @classmethod
+    def da_config(cls, config: Mapping) -> Optional["RoiSelector"]:
+        """"roi": [x, y, w, h] fixo ou "auto" (partindo de "roi_aprendido", se houver); ausente = frame inteiro."""
+        roi = config.get("roi")
+        if roi == "auto":
+            return cls(config.get("roi_aprendido"), auto=True)
+        if roi:
+            return cls(roi)
+        return None
+
+    @property
+    def fixo(self) -> bool:
+        return not self.auto and self.roi is not None
+
+    def regiao(self, shape) -> Optional[Tuple[int, int, int, int]]:
+        """(x0, y0, x1, y1) em pixels para um frame de `shape`, ou None para usar o frame inteiro."""
+        if self.roi is None or self.roi[2] * self.roi[3] > self.cobertura_maxima:
+            return None
+        h, w = shape[:2]
+        x, y, rw, rh = self.roi
+        x0, y0 = int(x * w), int(y * h)
+        x1, y1 = min(w, int(round((x + rw) * w))), min(h, int(round((y + rh) * h)))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    def recortar(self, frame):
+        regiao = self.regiao(frame.shape)
+        if regiao is None:
+            return frame
+        x0, y0, x1, y1 = regiao
+        return frame[y0:y1, x0:x1]
+
+    def aprender(self, pessoas: "np.ndarray", shape):
+        """Auto-ROI: acumula as caixas (em pixels do frame inteiro) e recalcula a região."""
+        if not self.auto or not len(pessoas):
+            return
+        h, w = shape[:2]
+        for x1, y1, x2, y2 in pessoas[:, :4]:
+            self._caixas.append((x1 / w, y1 / h, x2 / w, y2 / h))
+        caixas = np.array(self._caixas, dtype=np.float32)
+        x0, y0 = caixas[:, 0].min(), caixas[:, 1].min()
+        x1, y1 = caixas[:, 2].max(), caixas[:, 3].max()
+        mx = max((x1 - x0) * self.margem, (self.tamanho_minimo - (x1 - x0)) / 2, 0.0)
+        my = max((y1 - y0) * self.margem, (self.tamanho_minimo - (y1 - y0)) / 2, 0.0)
+        self.roi = self._validar((max(0.0, x0 - mx), max(0.0, y0 - my), x1 - x0 + 2 * mx, y1 - y0 + 2 * my))
+
+
+class LatencyMeter:
+    """Janela das últimas latências em ms (captura -> decisão, tempo de inferência)."""
+    def __init__(self, tamanho: int = 200, rotulo: str = "decisões"):
+        self._amostras = deque(maxlen=tamanho)
+        self.rotulo = rotulo
+
+    def registrar(self, segundos: float):
+        self._amostras.append(segundos * 1000.0)
+
+    def percentil(self, p: float) -> Optional[float]:
+        if not self._amostras:
+            return None
+        return float(np.percentile(np.fromiter(self._amostras, dtype=np.float64), p))
+
+    def resumo(self) -> str:
+        if not self._amostras:
+            return "sem amostras"
+        return f"p50 {self.percentil(50):.0f} ms / p95 {self.percentil(95):.0f} ms ({len(self._amostras)} {self.rotulo})"
+
+
+class MotionPresenceHeuristic:
+    """
+    Presença estimada sem modelo, para quando a CPU é do jogo: quem está ao PC se mexe com frequência.
+    Se nenhuma diferença entre frames avaliados passar de `limiar` por `janela` segundos, a cena é
+    considerada vazia. Custo: uma miniatura 64x48 por frame.
+    """
+    def __init__(self, limiar: float = 2.0, janela: float = 10.0, tamanho: Tuple[int, int] = (64, 48)):
+        self.limiar = limiar
+        self.janela = janela
+        self.tamanho = tamanho
+        self._anterior = None
+        self._ultimo_movimento = float("-inf")
+
+    def reset(self, presente: bool, agora: float):
+        """Parte do último estado conhecido, para a troca de orçamento não disparar PAUSE/RESUME sozinha."""
+        self._anterior = None
+        self._ultimo_movimento = agora if presente else float("-inf")
+
+    def presente(self, frame, agora: float) -> bool:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        miniatura = cv2.resize(gray, self.tamanho, interpolation=cv2.INTER_AREA)
+        if self._anterior is not None and float(cv2.absdiff(miniatura, self._anterior).mean()) >= self.limiar:
+            self._ultimo_movimento = agora
+        self._anterior = miniatura
+        return agora - self._ultimo_movimento < self.janela
+
+
+class VigiaBudget:
+    """
+    Orçamento de CPU do Vigia. Campos None herdam a configuração do VigiaManager.
+    - intervalo_rapido / intervalo_lento / max_sem_inferencia: mesma semântica do VigiaManager
+    - imgsz: entrada menor para o modelo; só vale se o VigiaManager a preparou na carga do modelo
+      (imgsz_reduzido), senão o detector carregado é mantido
+    - heuristica: troca o modelo pela MotionPresenceHeuristic
+    """
+    def __init__(self, nome: str,
+                 intervalo_rapido: Optional[float] = None,
+                 intervalo_lento: Optional[float] = None,
+                 max_sem_inferencia: Optional[float] = None,
+                 imgsz: Optional[int] = None,
+                 heuristica: bool = False):
+        self.nome = nome
+        self.intervalo_rapido = intervalo_rapido
+        self.intervalo_lento = intervalo_lento
+        self.max_sem_inferencia = max_sem_inferencia
+        self.imgsz = imgsz
+        self.heuristica = heuristica
+
+
+ORCAMENTOS = {
+    "completo": VigiaBudget("completo"),
+    "reduzido": VigiaBudget("reduzido", intervalo_rapido=0.5, intervalo_lento=2.0, max_sem_inferencia=15.0),
+    "heuristica": VigiaBudget("heuristica", intervalo_rapido=0.5, intervalo_lento=1.0, heuristica=True),
+}
+
+def criar_orcamento(config: Union[str, Mapping, None], padrao: str = "reduzido") -> VigiaBudget:
+    """
+    Nome de ORCAMENTOS ou dict com "base" (um nome) e os campos a sobrescrever,
+    ex.: {"base": "reduzido", "imgsz": 224, "intervalo_lento": 3.0}.
+    """
+    if config is None:
+        return ORCAMENTOS[padrao]
+    if isinstance(config, str):
+        if config not in ORCAMENTOS:
+            raise ValueError(f"Orçamento do Vigia desconhecido: '{config}' (use {', '.join(ORCAMENTOS)}).")
+        return ORCAMENTOS[config]
+    base = criar_orcamento(config.get("base", padrao))
+    campos = {k: getattr(base, k) for k in ("intervalo_rapido", "intervalo_lento", "max_sem_inferencia", "imgsz", "heuristica")}
+    campos.update({k: v for k, v in config.items() if k in campos})
+    return VigiaBudget(config.get("nome", f"{base.nome}*"), **campos)
+
+
+class VigiaPipeline:
+    """
+    Decisão por frame do Vigia: filtro de movimento -> detector -> debounce de presença.
+    Sem threads nem relógio próprio (o chamador informa `agora`), para o loop ao vivo e o
+    benchmark sobre vídeo gravado tomarem exatamente as mesmas decisões.
+    """
+    def __init__(self,
+                 detector: PersonDetector,
+                 min_no_person_seconds: float = 2.0,
+                 min_person_seconds: float = 1.0,
+                 intervalo_rapido: float = 0.05,
+                 intervalo_lento: float = 0.5,
+                 limiar_movimento: float = 4.0,
+                 max_sem_inferencia: float = 5.0,
+                 roi: Optional[RoiSelector] = None):
+        self.detector = detector
+        self.roi = roi
+        self.intervalo_rapido = intervalo_rapido
+        self.intervalo_lento = intervalo_lento
+        self.max_sem_inferencia = max_sem_inferencia
+        self._base = (intervalo_rapido, intervalo_lento, max_sem_inferencia)
+        self.debouncer = PresenceDebouncer(min_no_person_seconds, min_person_seconds)
+        self.gate = MotionGate(limiar=limiar_movimento)
+        self.heuristica: Optional[MotionPresenceHeuristic] = None
+        self.orcamento = ORCAMENTOS["completo"]
+        self.ultima_inferencia = float("-inf")
+        self.stats = {"frames": 0, "inferencias": 0, "pulados": 0, "heuristica": 0, "roi_conferidos": 0, "pixels": 0}
+        self.inferencia = LatencyMeter(rotulo="inferências")
+
+    def _detectar(self, frame) -> "np.ndarray":
+        """Detector sobre o recorte da ROI (se houver), com as caixas devolvidas em coordenadas do frame."""
+        regiao = self.roi.regiao(frame.shape) if self.roi else None
+        if regiao is None:
+            pessoas = self.detector.detectar(frame)
+            self.stats["pixels"] += frame.shape[0] * frame.shape[1]
+        else:
+            x0, y0, x1, y1 = regiao
+            pessoas = self.detector.detectar(frame[y0:y1, x0:x1])
+            self.stats["pixels"] += (x1 - x0) * (y1 - y0)
+            if len(pessoas):
+                pessoas[:, [0, 2]] += x0
+                pessoas[:, [1, 3]] += y0
+            elif self.roi.auto:
+                pessoas = self.detector.detectar(frame)
+                self.stats["pixels"] += frame.shape[0] * frame.shape[1]
+                self.stats["roi_conferidos"] += 1
+        if self.roi:
+            self.roi.aprender(pessoas, frame.shape)
+        return pessoas
+
+    def processar(self, frame, agora: float) -> Optional[str]:
+        """Avalia um frame e retorna TOKEN_PAUSE/TOKEN_RESUME quando o debounce dispara. Erros do detector sobem."""
+        self.stats["frames"] += 1
+        # ROI fixa: movimento fora da região não interessa
+        observado = self.roi.recortar(frame) if self.roi and self.roi.fixo else frame
+
+        if self.heuristica is not None:
+            person_detected = self.heuristica.presente(observado, agora)
+            self.stats["heuristica"] += 1
+        # Cena parada e presença já conhecida: reaproveita a última decisão sem rodar o modelo
+        elif (not self.gate.mudou(observado) and self.debouncer.estavel(agora)
+                and agora - self.ultima_inferencia < self.max_sem_inferencia):
+            person_detected = self.debouncer.observado
+            self.stats["pulados"] += 1
+        else:
+            # inferência (rápida): só caixas da classe person, já filtradas pelo detector
+            inicio = time.perf_counter()
+            pessoas = self._detectar(frame)
+            self.inferencia.registrar(time.perf_counter() - inicio)
+            self.gate.marcar_referencia()
+            self.ultima_inferencia = agora
+            self.stats["inferencias"] += 1
+            person_detected = len(pessoas) > 0
+
+        return self.debouncer.atualizar(person_detected, agora)
+
+    def intervalo(self, agora: float) -> float:
+        """Taxa adaptativa: rápido enquanto o estado é incerto, lento depois de estável."""
+        return self.intervalo_lento if self.debouncer.estavel(agora) else self.intervalo_rapido
+
+    def aplicar_orcamento(self, orcamento: VigiaBudget, agora: float, detector: Optional[PersonDetector] = None):
+        """Troca taxa/detector/heurística sem perder o estado do debounce (nem a pausa pedida pelo vigia)."""
+        rapido, lento, max_sem = self._base
+        self.intervalo_rapido = rapido if orcamento.intervalo_rapido is None else orcamento.intervalo_rapido
+        self.intervalo_lento = lento if orcamento.intervalo_lento is None else orcamento.intervalo_lento
+        self.max_sem_inferencia = max_sem if orcamento.max_sem_inferencia is None else orcamento.max_sem_inferencia
+        if detector is not None:
+            self.detector = detector
+        if orcamento.heuristica:
+            if self.heuristica is None:
+                self.heuristica = MotionPresenceHeuristic()
+                self.heuristica.reset(self.debouncer.observado is not False, agora)
+        else:
+            self.heuristica = None
+            # Referência do filtro de movimento pode ser de outro detector/entrada: força uma inferência nova
+            self.gate.reset()
+            self.ultima_inferencia = float("-inf")
+        self.orcamento = orcamento
 
-try:
-    from ultralytics import YOLO
-except Exception:
-    YOLO = None
 
 class VigiaManager:
     """
     Vigia (YOLO + webcam) em thread separada.
     - schedule_cmd: callable(token: str) -> None
         usado para enviar comandos especiais ao loop assíncrono (ex.: "__VIGIA_PAUSE__", "__VIGIA_RESUME__")
-    - model_path: caminho para o yolov8 .pt
-    - min_no_person_frames: quantos frames consecutivos sem pessoa disparam PAUSE
-    - min_person_frames: quantos frames consecutivos com pessoa disparam RESUME
+    - model_path: caminho para o yolov8 .pt (ou um .onnx já exportado)
+    - fonte: None usa a câmera `camera_index`; um caminho de vídeo ou diretório de imagens é tocado
+        em tempo real e em loop no lugar da webcam (ver criar_fonte)
+    Resolução de captura e ROI ficam por câmera em config.json -> vigia_cameras -> "<índice ou caminho>":
+        {"largura": 640, "altura": 480, "roi": null | [x, y, w, h] | "auto"}; a ROI aprendida no modo
+        "auto" é gravada em "roi_aprendido" a cada stop() e reaproveitada no próximo start().
+    - detector_backend: "auto", "onnx" ou "ultralytics" (ver criar_detector)
+    - imgsz / conf: tamanho de entrada do modelo e confiança mínima para contar uma pessoa
+    - imgsz_reduzido: entrada menor usada por orçamentos com imgsz; o detector é montado (e exportado
+        para ONNX) junto com o principal, nunca no meio de uma partida
+    - min_no_person_seconds: quantos segundos contínuos sem pessoa disparam PAUSE
+    - min_person_seconds: quantos segundos contínuos com pessoa disparam RESUME
+    - intervalo_rapido / intervalo_lento: pausa entre frames enquanto o estado é incerto / depois de estável
+    - limiar_movimento: diferença média (0-255) entre miniaturas abaixo da qual a cena é considerada parada
+    - max_sem_inferencia: mesmo com a cena parada, roda o modelo pelo menos a cada N segundos
+    - camera_idle_seconds: depois do stop() a câmera fica "estacionada" (aberta, sem leitura) por N
+        segundos, para um novo start() ser instantâneo; 0 libera na hora
+    Orçamento de CPU: definir_orcamento(VigiaBudget) reduz taxa/entrada ou troca o modelo por uma
+    heurística de movimento (ex.: durante jogos, ver VigiaGovernor); vale na hora, mesmo rodando.
+    Sessão quente: o modelo é carregado uma única vez (preload() adianta isso em segundo plano)
+    e continua residente entre start/stop; shutdown() libera tudo no encerramento do app.
     """
-    TOKEN_PAUSE = "__VIGIA_PAUSE__"
-    TOKEN_RESUME = "__VIGIA_RESUME__"
+    TOKEN_PAUSE = TOKEN_PAUSE
+    TOKEN_RESUME = TOKEN_RESUME
 
     def __init__(self,
                  schedule_cmd: Callable[[str], None],
                  model_path: str = "yolov8n.pt",
                  camera_index: int = 0,
-                 min_no_person_frames: int = 12,
-                 min_person_frames: int = 6,
+                 min_no_person_seconds: float = 2.0,
+                 min_person_seconds: float = 1.0,
+                 intervalo_rapido: float = 0.05,
+                 intervalo_lento: float = 0.5,
+                 limiar_movimento: float = 4.0,
+                 max_sem_inferencia: float = 5.0,
+                 detector_backend: str = "auto",
+                 imgsz: int = 320,
+                 conf: float = 0.4,
+                 imgsz_reduzido: Optional[int] = None,
+                 camera_idle_seconds: float = 60.0,
+                 fonte: Optional[Union[int, str]] = None,
                  log_fn: Optional[Callable[[str, str], None]] = None):
         self.schedule_cmd = schedule_cmd
         self.model_path = model_path
         self.camera_index = camera_index
-        self.min_no_person_frames = min_no_person_frames
-        self.min_person_frames = min_person_frames
+        self.min_no_person_seconds = min_no_person_seconds
+        self.min_person_seconds = min_person_seconds
+        self.intervalo_rapido = intervalo_rapido
+        self.intervalo_lento = intervalo_lento
+        self.limiar_movimento = limiar_movimento
+        self.max_sem_inferencia = max_sem_inferencia
+        self.detector_backend = detector_backend
+        self.imgsz = imgsz
+        self.conf = conf
+        self.imgsz_reduzido = imgsz_reduzido if imgsz_reduzido != imgsz else None
+        self.camera_idle_seconds = camera_idle_seconds
+        self.fonte = fonte
+        self.stats = {"frames": 0, "inferencias": 0, "pulados": 0}
+        self.latencia = LatencyMeter()
+        self.inferencia = LatencyMeter(rotulo="inferências")
+        self.orcamento = ORCAMENTOS["completo"]
         self.log_fn = log_fn or (lambda msg, tag="info": print(f"{tag.upper()}: {msg}"))
 
         self._thread = None
@@ -40,7 +828,14 @@ class VigiaManager:
         self._running = False
 
         self._cap = None
-        self._model = None
+        self._frames = LatestFrameBuffer()
+        self._captura: Optional[CaptureThread] = None
+        self._detector: Optional[PersonDetector] = None
+        self._detector_reduzido: Optional[PersonDetector] = None
+        self._imgsz_avisado: Optional[int] = None
+        self._model_lock = threading.Lock()
+        self._camera_lock = threading.Lock()
+        self._release_timer: Optional[threading.Timer] = None
 
     def _log(self, message: str, tag: str = "vigia"):
         try:
@@ -53,9 +848,10 @@ class VigiaManager:
             self._log("Vigia já está a correr.", "warning")
             return
         self._stop_event.clear()
+        # _running sobe antes da thread: o timer de câmera ociosa nunca vê um start em andamento como parado
+        self._running = True
         self._thread = threading.Thread(target=self._run, daemon=True, name="VigiaThread")
         self._thread.start()
-        self._running = True
         self._log("Vigia iniciado.", "vigia")
 
     def stop(self):
@@ -64,11 +860,39 @@ class VigiaManager:
             return
         self._stop_event.set()
         if self._thread:
-            self._thread.join(timeout=2.0)
+            # Sem timeout: um _run antigo ainda vivo estacionaria a câmera da próxima sessão ao terminar.
+            # O loop acorda pelo _stop_event, então a espera é de no máximo uma inferência.
+            self._thread.join()
         self._running = False
-        self._release_resources()
+        self._estacionar_camera()
         self._log("Vigia parado.", "vigia")
 
+    def shutdown(self):
+        """Encerramento do app: para o vigia e libera câmera e modelo de verdade."""
+        if self._running:
+            self.stop()
+        self._release_resources()
+        self._detector = None
+        self._detector_reduzido = None
+
+    def preload(self):
+        """Carrega o modelo em segundo plano (ex.: na abertura do app) para o primeiro start() ser rápido."""
+        if self._detector is not None:
+            return
+        def _carregar():
+            try:
+                self._garantir_modelo()
+            except Exception:
+                pass  # _load_model já registrou o erro; start() tentará de novo
+        threading.Thread(target=_carregar, daemon=True, name="VigiaPreloadThread").start()
+
+    def definir_orcamento(self, orcamento: VigiaBudget):
+        """Aplicado pelo loop no próximo frame (ou no próximo start)."""
+        if orcamento is self.orcamento:
+            return
+        self.orcamento = orcamento
+        self._log(f"Orçamento de CPU do Vigia: {orcamento.nome}.", "vigia")
+
     def toggle(self):
         if self._running:
             self.stop()
@@ -79,29 +903,82 @@ class VigiaManager:
         return self._running
 
     def _load_model(self):
-        if YOLO is None:
-            raise RuntimeError("ultralytics YOLO não disponível (instale ultralytics).")
         try:
-            self._model = YOLO(self.model_path)
-            self._log("Modelo YOLO carregado.", "vigia")
+            self._detector = criar_detector(self.detector_backend, self.model_path, imgsz=self.imgsz, conf=self.conf, log_fn=self._log)
+            self._log(f"Modelo YOLO carregado (backend: {self._detector.nome}, entrada {self.imgsz}px).", "vigia")
         except Exception as e:
-            self._model = None
+            self._detector = None
             self._log(f"Falha ao carregar modelo YOLO: {e}", "error")
             raise
+        if self.imgsz_reduzido:
+            try:
+                self._detector_reduzido = criar_detector(self.detector_backend, self.model_path, imgsz=self.imgsz_reduzido,
+                                                         conf=self.conf, log_fn=self._log)
+                self._log(f"Detector reduzido carregado (backend: {self._detector_reduzido.nome}, entrada {self.imgsz_reduzido}px).", "vigia")
+            except Exception as e:
+                self._detector_reduzido = None
+                self._log(f"Detector com entrada {self.imgsz_reduzido}px indisponível ({e}); orçamentos usarão {self.imgsz}px.", "warning")
 
-    def _open_camera(self):
-        try:
-            cap = cv2.VideoCapture(self.camera_index, cv2.CAP_DSHOW if hasattr(cv2, "CAP_DSHOW") else 0)
-        except Exception:
-            cap = cv2.VideoCapture(self.camera_index)
-        if not cap.isOpened():
-            raise RuntimeError(f"Não foi possível abrir a câmera index={self.camera_index}")
-        # configurações opcionais
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        return cap
+    def _garantir_modelo(self):
+        # O lock faz start() esperar um preload() em andamento em vez de carregar o modelo duas vezes
+        with self._model_lock:
+            if self._detector is None:
+                self._load_model()
 
-    def _release_resources(self):
+    def _detector_para(self, imgsz: Optional[int]) -> PersonDetector:
+        # Nunca monta detector aqui: exportar/carregar outro modelo no meio do jogo custa segundos de CPU
+        if imgsz is None or imgsz == self.imgsz:
+            return self._detector
+        if imgsz == self.imgsz_reduzido and self._detector_reduzido is not None:
+            return self._detector_reduzido
+        if imgsz != self._imgsz_avisado:
+            self._imgsz_avisado = imgsz
+            self._log(f"Entrada {imgsz}px não foi preparada na carga do modelo (imgsz_reduzido); mantendo {self.imgsz}px.", "warning")
+        return self._detector
+
+    def _aplicar_orcamento(self, pipeline: VigiaPipeline, orcamento: VigiaBudget):
+        detector = None if orcamento.heuristica else self._detector_para(orcamento.imgsz)
+        pipeline.aplicar_orcamento(orcamento, time.monotonic(), detector)
+
+    def _garantir_camera(self):
+        with self._camera_lock:
+            if self._release_timer is not None:
+                self._release_timer.cancel()
+                self._release_timer = None
+            if self._cap is not None and self._cap.isOpened():
+                self._log("Câmera estacionada reaproveitada.", "vigia")
+                return
+            self._cap = self._open_camera()
+
+    def _estacionar_camera(self):
+        """Para a leitura mas mantém a câmera aberta por camera_idle_seconds."""
+        if self._captura is not None:
+            self._captura.stop()
+            self._captura = None
+        self._frames.limpar()
+        if self.camera_idle_seconds <= 0:
+            self._release_resources()
+            return
+        with self._camera_lock:
+            if self._cap is None or self._release_timer is not None:
+                return
+            self._release_timer = threading.Timer(self.camera_idle_seconds, self._liberar_camera_ociosa)
+            self._release_timer.daemon = True
+            self._release_timer.start()
+
+    def _liberar_camera_ociosa(self):
+        # Tudo sob o lock de _garantir_camera: um start() concorrente ou reaproveita a câmera antes
+        # (e cancela este timer) ou só a abre de novo depois que ela foi fechada aqui
+        with self._camera_lock:
+            if self._release_timer is not threading.current_thread():
+                return  # cancelado/substituído depois de já ter disparado
+            self._release_timer = None
+            if self._running or self._captura is not None:
+                return
+            self._fechar_camera()
+
+    def _fechar_camera(self):
+        """Chamar com _camera_lock."""
         try:
             if self._cap and self._cap.isOpened():
                 self._cap.release()
@@ -110,89 +987,262 @@ class VigiaManager:
         except Exception:
             pass
 
+    @property
+    def chave_camera(self) -> str:
+        return str(self.camera_index if self.fonte is None else self.fonte)
+
+    def _open_camera(self) -> FrameSource:
+        if self.fonte is None:
+            config = carregar_config_camera(self.chave_camera)
+            if not config:
+                salvar_config_camera(self.chave_camera, largura=640, altura=480, roi=None)
+            return CameraSource(self.camera_index, config.get("largura", 640), config.get("altura", 480))
+        fonte = criar_fonte(self.fonte, tempo_real=True, loop=True)
+        self._log(f"Vigia lendo de '{self.fonte}' ({fonte.nome}, {fonte.fps:.0f} fps) em vez da câmera.", "vigia")
+        return fonte
+
+    def _release_resources(self):
+        with self._camera_lock:
+            if self._release_timer is not None:
+                self._release_timer.cancel()
+                self._release_timer = None
+        if self._captura is not None:
+            self._captura.stop()
+            self._captura = None
+        self._frames.limpar()
+        with self._camera_lock:
+            self._fechar_camera()
+
     def _run(self):
         try:
-            self._load_model()
+            self._garantir_modelo()
         except Exception as e:
             self._log(f"Vigia abortado: {e}", "error")
             self._running = False
             return
 
         try:
-            self._cap = self._open_camera()
+            self._garantir_camera()
         except Exception as e:
             self._log(f"Vigia abortado: {e}", "error")
             self._running = False
             return
 
-        no_person_counter = 0
-        person_counter = 0
-        video_paused_by_vigia = False
+        self._frames = LatestFrameBuffer()
+        self._captura = CaptureThread(self._cap, self._frames, self._log)
+        self._captura.start()
+
+        pipeline = VigiaPipeline(self._detector,
+                                 min_no_person_seconds=self.min_no_person_seconds,
+                                 min_person_seconds=self.min_person_seconds,
+                                 intervalo_rapido=self.intervalo_rapido,
+                                 intervalo_lento=self.intervalo_lento,
+                                 limiar_movimento=self.limiar_movimento,
+                                 max_sem_inferencia=self.max_sem_inferencia,
+                                 roi=RoiSelector.da_config(carregar_config_camera(self.chave_camera)))
+        if pipeline.roi:
+            self._log(f"Vigia usando ROI {'automática' if pipeline.roi.auto else 'fixa'}: {pipeline.roi.roi or 'frame inteiro'}.", "vigia")
+        debouncer = pipeline.debouncer
+        ultimo_seq = 0
+        if self.orcamento is not pipeline.orcamento:
+            self._aplicar_orcamento(pipeline, self.orcamento)
+        self.stats = pipeline.stats
+        self.inferencia = pipeline.inferencia
+        self.latencia = LatencyMeter()
 
-        # loop principal
+        # loop principal: sempre consome o frame mais recente publicado pela thread de captura
         while not self._stop_event.is_set():
-            ret, frame = self._cap.read()
-            if not ret:
-                time.sleep(0.1)
+            item = self._frames.obter(ultimo_seq, timeout=0.5)
+            if item is None:
                 continue
+            frame, capturado_em, ultimo_seq = item
+
+            orcamento = self.orcamento
+            if orcamento is not pipeline.orcamento:
+                self._aplicar_orcamento(pipeline, orcamento)
 
-            # inferência (rápida): usa model(frame) -> results
             try:
-                results = self._model(frame, verbose=False)
+                token = pipeline.processar(frame, time.monotonic())
             except Exception as e:
                 # Em caso de erro de inferência, apenas log e continue
                 self._log(f"Erro de inferência YOLO: {e}", "error")
                 time.sleep(0.15)
                 continue
 
-            # verificar se existe 'person' nas detecções
-            person_detected = False
-            try:
-                for r in results:
-                    # r.boxes.cls é array de classes. model.names mapping existe.
-                    if hasattr(r, "boxes") and hasattr(r.boxes, "cls"):
-                        for cls_idx in r.boxes.cls:
-                            idx = int(cls_idx)
-                            name = self._model.names.get(idx) if hasattr(self._model, "names") else None
-                            if name and name.lower() == "person":
-                                person_detected = True
-                                break
-                    if person_detected:
-                        break
-            except Exception:
-                # se formato inesperado, considerar como não detectado
-                person_detected = False
-
-            if person_detected:
-                person_counter += 1
-                no_person_counter = 0
-            else:
-                no_person_counter += 1
-                person_counter = 0
-
-            # Debounce: se muitos frames seguidos sem pessoa => PAUSE
-            if no_person_counter >= self.min_no_person_frames and not video_paused_by_vigia:
+            self.latencia.registrar(time.monotonic() - capturado_em)
+            if token == self.TOKEN_PAUSE:
                 # enviar token de pause
                 try:
                     self.schedule_cmd(self.TOKEN_PAUSE)
-                    video_paused_by_vigia = True
                     self._log("Nenhuma pessoa detectada — solicitada PAUSA.", "vigia")
                 except Exception as e:
+                    debouncer.video_paused_by_vigia = False
                     self._log(f"Erro ao agendar PAUSA do vigia: {e}", "error")
-
-            # Debounce: se pessoa detectada por vários frames e vídeo estava pausado pelo vigia => RESUME
-            if person_counter >= self.min_person_frames and video_paused_by_vigia:
+            elif token == self.TOKEN_RESUME:
                 try:
                     self.schedule_cmd(self.TOKEN_RESUME)
-                    video_paused_by_vigia = False
                     self._log("Pessoa detectada — solicitada RETOMADA.", "vigia")
                 except Exception as e:
+                    debouncer.video_paused_by_vigia = True
                     self._log(f"Erro ao agendar RESUME do vigia: {e}", "error")
 
-            # sleeping leve para não saturar CPU
-            time.sleep(0.05)
+            self._stop_event.wait(pipeline.intervalo(time.monotonic()))
 
-        # fim do loop
-        self._release_resources()
+        # fim do loop; só a sessão atual mexe no estado compartilhado (câmera, _running)
+        if threading.current_thread() is not self._thread:
+            return
+        self._estacionar_camera()
+        if pipeline.roi and pipeline.roi.auto and pipeline.roi.roi:
+            try:
+                salvar_config_camera(self.chave_camera, roi_aprendido=list(pipeline.roi.roi))
+            except Exception as e:
+                self._log(f"Não foi possível gravar a ROI aprendida: {e}", "warning")
+        self._log(f"Latência captura→decisão: {self.latencia.resumo()}; inferência: {self.inferencia.resumo()}; "
+                  f"frames descartados: {self._frames.descartados}.", "vigia")
         self._log("Loop do Vigia terminado.", "vigia")
         self._running = False
+
+
+class VigiaGovernor:
+    """
+    Liga o PCMonitor ao Vigia pelo status do assistente: enquanto o estado for "jogando",
+    o Vigia roda com `orcamento_jogo`; quando o jogo fecha, volta ao orçamento completo.
+    - on_status(status): assinante do StatusBus (o PCMonitor publica "jogando"/"padrao")
+    - publicar_fn(**campos): recebe vigia_orcamento=<nome>, para a GUI mostrar o orçamento atual
+    """
+    def __init__(self, vigia: VigiaManager, orcamento_jogo: VigiaBudget,
+                 publicar_fn: Optional[Callable[..., None]] = None):
+        self.vigia = vigia
+        self.orcamento_jogo = orcamento_jogo
+        self.publicar_fn = publicar_fn
+        self._lock = threading.Lock()
+
+    def on_status(self, status: Mapping):
+        orcamento = self.orcamento_jogo if status.get("estado") == "jogando" else ORCAMENTOS["completo"]
+        with self._lock:
+            if orcamento is self.vigia.orcamento:
+                return
+            self.vigia.definir_orcamento(orcamento)
+        if self.publicar_fn:
+            self.publicar_fn(vigia_orcamento=orcamento.nome)
+
+
+def benchmark_vigia(origem: Union[str, Path],
+                    detector_backend: str = "auto",
+                    model_path: str = "yolov8n.pt",
+                    imgsz: int = 320,
+                    conf: float = 0.4,
+                    todos_os_frames: bool = False,
+                    orcamento: Union[str, Mapping, None] = None,
+                    roi: Union[str, List[float], None] = None,
+                    **opcoes_pipeline) -> Dict:
+    """
+    Reproduz um vídeo (ou diretório de imagens) pelo VigiaPipeline completo, o mais rápido possível,
+    usando o tempo da gravação como relógio. Com isso o resultado não depende da máquina: os mesmos
+    frames são avaliados e os tokens caem nos mesmos instantes, e só os tempos medidos mudam.
+    - todos_os_frames=False respeita a taxa adaptativa (intervalo_rapido/lento) como o loop ao vivo;
+      True avalia cada frame do arquivo
+    - orcamento: nome/dict aceito por criar_orcamento, para medir um orçamento de CPU (ex.: "reduzido")
+    - roi: "auto" ou [x, y, w, h] normalizados, como em vigia_cameras (nada é gravado no config.json)
+    - opcoes_pipeline: repassadas ao VigiaPipeline (min_no_person_seconds, limiar_movimento, ...)
+    O tempo de carga do modelo fica de fora das medições.
+    """
+    orcamento = criar_orcamento(orcamento, padrao="completo")
+    imgsz = orcamento.imgsz or imgsz
+    detector = None if orcamento.heuristica else criar_detector(detector_backend, model_path, imgsz=imgsz, conf=conf)
+    fonte = criar_fonte(origem, tempo_real=False)
+    if not isinstance(fonte, ReplaySource):
+        fonte.release()
+        raise RuntimeError("O benchmark precisa de um vídeo ou diretório de imagens, não de uma câmera.")
+    pipeline = VigiaPipeline(detector, roi=RoiSelector.da_config({"roi": roi}), **opcoes_pipeline)
+    pipeline.aplicar_orcamento(orcamento, 0.0)
+    eventos: List[Tuple[float, str]] = []
+    proximo = 0.0
+    frame_area = 0
+
+    cpu_inicio = time.process_time()
+    inicio = time.perf_counter()
+    try:
+        while True:
+            ok, frame = fonte.read()
+            if not ok:
+                break
+            agora = fonte.timestamp
+            frame_area = frame.shape[0] * frame.shape[1]
+            if not todos_os_frames and agora < proximo:
+                continue
+            token = pipeline.processar(frame, agora)
+            if token:
+                eventos.append((agora, token))
+            proximo = agora + pipeline.intervalo(agora)
+    finally:
+        fonte.release()
+    tempo = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu_inicio
+
+    avaliados = pipeline.stats["frames"]
+    inferencias = pipeline.stats["inferencias"]
+    return {
+        "origem": str(origem),
+        "detector": detector.nome if detector else "heurística de movimento",
+        "orcamento": orcamento.nome,
+        "imgsz": imgsz,
+        "duracao_gravacao_s": fonte.entregues / fonte.fps,
+        "frames_lidos": fonte.entregues,
+        "frames_avaliados": avaliados,
+        "inferencias": pipeline.stats["inferencias"],
+        "pulados": pipeline.stats["pulados"],
+        "roi": pipeline.roi.roi if pipeline.roi else None,
+        "roi_conferidos": pipeline.stats["roi_conferidos"],
+        "pixels_por_inferencia": pipeline.stats["pixels"] / inferencias if inferencias else 0.0,
+        "pixels_frame": frame_area,
+        "tempo_s": tempo,
+        "fps": avaliados / tempo if tempo > 0 else 0.0,
+        "inferencia_p50_ms": pipeline.inferencia.percentil(50),
+        "inferencia_p95_ms": pipeline.inferencia.percentil(95),
+        "cpu_s": cpu,
+        "cpu_por_frame_ms": cpu * 1000.0 / avaliados if avaliados else 0.0,
+        "eventos": eventos,
+    }
+
+
+def _formatar_benchmark(r: Dict) -> str:
+    def ms(valor):
+        return "-" if valor is None else f"{valor:.1f} ms"
+    linhas = [
+        f"Origem: {r['origem']} ({r['duracao_gravacao_s']:.1f} s gravados, {r['frames_lidos']} frames)",
+        f"Detector: {r['detector']} @ {r['imgsz']}px (orçamento {r['orcamento']})",
+        f"Frames avaliados: {r['frames_avaliados']} ({r['inferencias']} inferências, {r['pulados']} pulados pelo filtro de movimento)",
+        f"Tempo: {r['tempo_s']:.2f} s -> {r['fps']:.1f} frames/s ({r['duracao_gravacao_s'] / max(r['tempo_s'], 1e-9):.1f}x tempo real)",
+        f"Inferência: p50 {ms(r['inferencia_p50_ms'])} / p95 {ms(r['inferencia_p95_ms'])}",
+        f"Pixels por inferência: {r['pixels_por_inferencia']:.0f} ({100 * r['pixels_por_inferencia'] / max(r['pixels_frame'], 1):.0f}% do frame); "
+        f"ROI final: {r['roi'] or 'frame inteiro'} ({r['roi_conferidos']} conferências no frame inteiro)",
+        f"CPU: {r['cpu_s']:.2f} s ({r['cpu_por_frame_ms']:.1f} ms por frame avaliado)",
+    ]
+    if not r["eventos"]:
+        linhas.append("Tokens: nenhum PAUSE/RESUME teria sido disparado.")
+    for instante, token in r["eventos"]:
+        nome = "PAUSE" if token == TOKEN_PAUSE else "RESUME"
+        linhas.append(f"  {int(instante // 60):02d}:{instante % 60:05.2f}  {nome}")
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    # Uso: python core_vigia.py <video|diretório> [backend] [imgsz] [--todos] [--orcamento=<nome>] [--roi=auto|x,y,w,h]
+    #   ex.: python core_vigia.py robo_conversando.mp4 onnx 320 --orcamento=reduzido
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print("Uso: python core_vigia.py <video|diretório> [auto|onnx|ultralytics] [imgsz] [--todos] "
+              f"[--orcamento={'|'.join(ORCAMENTOS)}] [--roi=auto|x,y,w,h]")
+        sys.exit(1)
+    orcamento_cli = next((a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--orcamento=")), None)
+    roi_cli = next((a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--roi=")), None)
+    if roi_cli and roi_cli != "auto":
+        roi_cli = [float(v) for v in roi_cli.split(",")]
+    resultado = benchmark_vigia(args[0],
+                                detector_backend=args[1] if len(args) > 1 else "auto",
+                                imgsz=int(args[2]) if len(args) > 2 else 320,
+                                todos_os_frames="--todos" in sys.argv,
+                                orcamento=orcamento_cli,
+                                roi=roi_cli)
+    print(_formatar_benchmark(resultado))
@@ -1,11 +1,252 @@
 # core_voice.py
+import re
 import threading
 import queue
 import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
 import speech_recognition as sr
-import pyttsx3
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
 
 from core_utils import log_interface, carregar_config_geral
+from core_stt import SpeechRecognizerBackend, criar_reconhecedor
+from core_tts import Fala, TTSWorker
+from core_desktop import IntentCache, avaliar_comando_desktop, interpretar_comando_desktop, intent_cache, intent_cache_parcial
+
+# Trechos fixos das falas do assistente, pré-sintetizados pelo TTSWorker
+FRASE_VOCE_DISSE = "Você disse:"
+FRASE_ESTA_CORRETO = "Está correto?"
+FRASES_FIXAS = (FRASE_VOCE_DISSE, FRASE_ESTA_CORRETO)
+
+# Despacho direto de comandos de desktop reconhecidos com confiança (ver VoiceManager._intencao_confiante)
+MARGEM_MINIMA_VOZ = 15        # pontos de vantagem sobre o segundo app/site mais parecido
+ESTABILIDADE_PARCIAL_VOZ = 0.4  # segundos que a mesma intenção precisa se manter nas transcrições parciais
+
+# Prefixo falado no começo do comando ("pc abrir steam", "yt, gatos"); o reconhecedor não põe a vírgula
+_RE_PREFIXO_VOZ = re.compile(r"\s*(pc|yt|web)\b[\s,.:;]*(.*)", re.IGNORECASE | re.DOTALL)
+
+def separar_prefixo(texto: str) -> Tuple[Optional[str], str]:
+    """'PC abrir steam' -> ('pc', 'abrir steam'); sem prefixo conhecido -> (None, texto sem espaços nas pontas)."""
+    m = _RE_PREFIXO_VOZ.fullmatch(texto)
+    if m is None:
+        return None, texto.strip()
+    return m.group(1).lower(), m.group(2).strip()
+
+
+class AudioRing:
+    """Últimos pedaços de áudio capturados, numerados em sequência; cada leitor acompanha pelo número."""
+    def __init__(self, max_pedacos: int):
+        self._cond = threading.Condition()
+        self._pedacos: Deque[Tuple[int, bytes, float]] = deque(maxlen=max_pedacos)
+        self.seq = 0
+
+    def publicar(self, pcm: bytes, energia: float):
+        with self._cond:
+            self.seq += 1
+            self._pedacos.append((self.seq, pcm, energia))
+            self._cond.notify_all()
+
+    def ler(self, depois_de: int, timeout: float) -> List[Tuple[int, bytes, float]]:
+        """Pedaços com seq > depois_de ainda no buffer ([] se nada novo chegar em `timeout`)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > depois_de, timeout)
+            return [p for p in self._pedacos if p[0] > depois_de]
+
+    def energias(self, ultimos: int) -> List[float]:
+        with self._cond:
+            return [p[2] for p in list(self._pedacos)[-ultimos:]]
+
+
+class MicCapture:
+    """
+    Microfone aberto uma única vez e lido continuamente por uma thread própria para um AudioRing.
+    - endpointing por VAD: a frase começa com fala (webrtcvad, se instalado, + energia acima do ruído)
+      e termina após `pausa` segundos de silêncio, sem timeouts fixos
+    - pre_roll: o áudio dos `pre_roll` segundos anteriores ao início da fala entra na frase, então a
+      primeira sílaba dita logo após o atalho não se perde
+    - ruído de fundo estimado continuamente (percentil baixo da energia recente), sem bloquear nada
+    - cauda_eco: ao ouvir a resposta a um prompt falado, o áudio dos `cauda_eco` segundos seguintes ao
+      fim do prompt também é descartado (o alto-falante ainda toca o fim da fala quando o TTS termina)
+    Áudio mono, 16 bits, em pedaços de `duracao_pedaco` segundos.
+    """
+    sample_width = 2
+
+    def __init__(self, sample_rate: int = 16000, duracao_pedaco: float = 0.03, segundos_buffer: float = 10.0,
+                 pre_roll: float = 0.4, pausa: float = 0.6, fator_ruido: float = 3.0,
+                 energia_minima: float = 150.0, agressividade_vad: int = 2, cauda_eco: float = 0.15):
+        self.sample_rate = sample_rate
+        self.duracao_pedaco = duracao_pedaco
+        self.pre_roll = pre_roll
+        self.pausa = pausa
+        self.fator_ruido = fator_ruido
+        self.energia_minima = energia_minima
+        self.agressividade_vad = agressividade_vad
+        self.cauda_eco = cauda_eco
+        self.ring = AudioRing(int(segundos_buffer / duracao_pedaco))
+        self.ruido: Optional[float] = None
+        self._vad = None
+        self._aberto = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def pedacos_por_segundo(self) -> float:
+        return 1.0 / self.duracao_pedaco
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="MicCaptureThread")
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _abrir(self, pa):
+        """Tenta 16 kHz (o que os reconhecedores querem) e cai para a taxa padrão do dispositivo."""
+        taxas = [self.sample_rate]
+        try:
+            taxas.append(int(pa.get_default_input_device_info()["defaultSampleRate"]))
+        except Exception:
+            pass
+        erro = None
+        for taxa in taxas:
+            frames = int(taxa * self.duracao_pedaco)
+            try:
+                stream = pa.open(format=pa.get_format_from_width(self.sample_width), channels=1, rate=taxa,
+                                 input=True, frames_per_buffer=frames)
+                self.sample_rate = taxa
+                return stream, frames
+            except Exception as e:
+                erro = e
+        raise RuntimeError(f"não foi possível abrir o microfone: {erro}")
+
+    def _run(self):
+        pyaudio = sr.Microphone.get_pyaudio()
+        pa = pyaudio.PyAudio()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    stream, frames = self._abrir(pa)
+                except Exception as e:
+                    log_interface(f"[VOZ] {e}", "error")
+                    self._stop_event.wait(5.0)
+                    continue
+                self._vad = None
+                if webrtcvad is not None and self.sample_rate in (8000, 16000, 32000, 48000):
+                    self._vad = webrtcvad.Vad(self.agressividade_vad)
+                self._aberto.set()
+                try:
+                    while not self._stop_event.is_set():
+                        pcm = stream.read(frames, exception_on_overflow=False)
+                        amostras = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+                        self.ring.publicar(pcm, float(np.sqrt(np.mean(amostras * amostras))) if len(amostras) else 0.0)
+                except Exception as e:
+                    # Microfone desconectado etc.: reabre em seguida
+                    log_interface(f"[VOZ] Captura do microfone interrompida: {e}", "warning")
+                finally:
+                    self._aberto.clear()
+                    try:
+                        stream.stop_stream()
+                        stream.close()
+                    except Exception:
+                        pass
+        finally:
+            pa.terminate()
+
+    def _calibrar(self):
+        energias = self.ring.energias(int(3.0 * self.pedacos_por_segundo))
+        if len(energias) >= int(0.5 * self.pedacos_por_segundo):
+            self.ruido = float(np.percentile(energias, 20))
+
+    def _limiar(self) -> float:
+        return max(self.energia_minima, (self.ruido or 0.0) * self.fator_ruido)
+
+    def _e_fala(self, pcm: bytes, energia: float, limiar: float) -> bool:
+        if energia < limiar:
+            return False
+        if self._vad is None:
+            return True
+        try:
+            return self._vad.is_speech(pcm, self.sample_rate)
+        except Exception:
+            return True
+
+    def ouvir_frase(self, timeout: float, phrase_time_limit: float,
+                    apos: Optional[threading.Event] = None) -> Iterator[bytes]:
+        """
+        Gera os pedaços de uma frase: pre-roll + fala até `pausa` s de silêncio (ou `phrase_time_limit`).
+        Levanta sr.WaitTimeoutError se ninguém começar a falar em `timeout` segundos.
+        `apos`: só considera o áudio capturado depois desse evento (ex.: fim da fala do assistente,
+        para o próprio prompt não ser ouvido como resposta). A leitura começa na hora: o que chega antes
+        dele (e na cauda de eco) é descartado, e o `timeout` só começa a contar quando ele acontece.
+        """
+        self.start()
+        if not self._aberto.wait(timeout):
+            raise sr.RequestError("microfone indisponível")
+        self._calibrar()
+        limiar = self._limiar()
+
+        por_segundo = self.pedacos_por_segundo
+        max_pre_roll = max(1, int(self.pre_roll * por_segundo))
+        pedacos_pausa = max(1, int(self.pausa * por_segundo))
+        inicio_minimo = 2  # pedaços seguidos de fala para considerar que a frase começou
+
+        if apos is not None:
+            seq = self.ring.seq
+            descartar_ate = None  # definido quando `apos` acontecer
+            fim_prompt_maximo = time.monotonic() + 30.0
+        else:
+            # Começa pelo pre-roll já no buffer: fala iniciada junto com o atalho também conta
+            seq = max(0, self.ring.seq - max_pre_roll)
+            descartar_ate = 0
+        pendentes: Deque[bytes] = deque(maxlen=max_pre_roll + inicio_minimo)
+        falando = 0
+        limite_espera = time.monotonic() + timeout
+
+        while True:
+            if descartar_ate is None:
+                if apos.is_set() or time.monotonic() > fim_prompt_maximo:
+                    descartar_ate = self.ring.seq + int(self.cauda_eco * por_segundo)
+                else:
+                    limite_espera = time.monotonic() + timeout
+            restante = limite_espera - time.monotonic()
+            if restante <= 0:
+                raise sr.WaitTimeoutError("nenhuma fala detectada")
+            novos = self.ring.ler(seq, min(restante, 0.5))
+            if not novos and not self._aberto.is_set():
+                raise sr.RequestError("microfone indisponível")
+            for seq, pcm, energia in novos:
+                if descartar_ate is None or seq <= descartar_ate:
+                    continue  # o próprio prompt (ou o eco dele) não é resposta
+                pendentes.append(pcm)
+                falando = falando + 1 if self._e_fala(pcm, energia, limiar) else 0
+                if falando >= inicio_minimo:
+                    break
+            if falando >= inicio_minimo:
+                break
+
+        fim_frase = time.monotonic() + phrase_time_limit
+        yield from pendentes
+        silencio = 0
+        while time.monotonic() < fim_frase:
+            novos = self.ring.ler(seq, 0.5)
+            if not novos and not self._aberto.is_set():
+                return
+            for seq, pcm, energia in novos:
+                yield pcm
+                silencio = 0 if self._e_fala(pcm, energia, limiar) else silencio + 1
+                if silencio >= pedacos_pausa:
+                    return
 
 
 class VoiceManager:
@@ -15,36 +256,113 @@ class VoiceManager:
     def __init__(self, command_queues: dict, ui_queue: queue.Queue):
         self.command_queues = command_queues
         self.ui_queue = ui_queue
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        # Stream único e contínuo; calibração de ruído acontece em segundo plano
+        self.mic = MicCapture()
+        self.mic.start()
 
-        try:
-            self.tts_engine = pyttsx3.init()
-            voices = self.tts_engine.getProperty('voices')
-            for voice in voices:
-                if 'brazil' in voice.name.lower():
-                    self.tts_engine.setProperty('voice', voice.id)
-                    break
-        except Exception as e:
-            log_interface(f"Erro ao inicializar o motor de TTS: {e}", "error")
-            self.tts_engine = None
+        # Fala numa thread própria: o fluxo de escuta nunca espera o runAndWait()
+        self.tts = TTSWorker(frases_fixas=FRASES_FIXAS)
 
         self.is_listening = False
         self.active_assistant = 'desktop'
 
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source)
+        # Modelos locais levam alguns segundos para abrir: carregados em segundo plano
+        self.reconhecedor: SpeechRecognizerBackend = None
+        self._reconhecedor_pronto = threading.Event()
+        threading.Thread(target=self._preparar_reconhecedor, daemon=True, name="VoiceRecognizerLoader").start()
 
-    def speak(self, text):
-        if self.tts_engine:
-            try:
-                self.ui_queue.put({"type": "log", "tag": "info", "message": f"Assistente: {text}"})
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
-            except Exception as e:
-                log_interface(f"Erro durante a fala do TTS: {e}", "error")
+    def _preparar_reconhecedor(self):
+        try:
+            self.reconhecedor = criar_reconhecedor(carregar_config_geral())
+            log_interface(f"[VOZ] Reconhecimento de voz: {self.reconhecedor.nome}"
+                          f"{' (offline, em streaming)' if self.reconhecedor.streaming else ''}.", "voz")
+        finally:
+            self._reconhecedor_pronto.set()
+
+    def _ouvir(self, timeout: float, phrase_time_limit: float, apos: Optional[threading.Event] = None,
+               aceitar_parcial: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Captura uma frase e a entrega ao reconhecedor pedaço a pedaço, durante a própria captura.
+        Se `aceitar_parcial(parcial)` retornar True, a captura termina ali e o parcial vira a transcrição.
+        Levanta sr.WaitTimeoutError, sr.UnknownValueError ou sr.RequestError.
+        """
+        if not self._reconhecedor_pronto.is_set():
+            self.ui_queue.put({"type": "voice_status", "message": "Carregando reconhecimento de voz..."})
+            self._reconhecedor_pronto.wait()
+        reconhecedor = self.reconhecedor
+        if reconhecedor is None:
+            raise sr.RequestError("reconhecedor de voz não carregado")
+
+        sessao = reconhecedor.nova_sessao(self.mic.sample_rate, self.mic.sample_width)
+        for pcm in self.mic.ouvir_frase(timeout=timeout, phrase_time_limit=phrase_time_limit, apos=apos):
+            parcial = sessao.aceitar(pcm)
+            if parcial:
+                self.ui_queue.put({"type": "voice_partial", "message": f"Ouvindo... '{parcial}'"})
+                if aceitar_parcial and aceitar_parcial(parcial):
+                    log_interface(f"[VOZ] {reconhecedor.nome}: '{parcial}' aceito pela transcrição parcial "
+                                  f"({sessao.segundos_de_audio:.1f} s de áudio).", "voz")
+                    return parcial
+        fim_da_fala = time.monotonic()
+
+        self.ui_queue.put({"type": "voice_partial", "message": "Processando..."})
+        texto = sessao.finalizar()
+        log_interface(f"[VOZ] {reconhecedor.nome}: '{texto}' em {(time.monotonic() - fim_da_fala) * 1000:.0f} ms "
+                      f"após o fim da fala ({sessao.segundos_de_audio:.1f} s de áudio).", "voz")
+        return texto
+
+    def _intencao_confiante(self, texto: str, cache: IntentCache = intent_cache) -> Optional[Dict]:
+        """
+        Comando de desktop sem ambiguidade: score >= limiar_confianca_voz (config.json) e pelo menos
+        MARGEM_MINIMA_VOZ pontos acima do segundo nome mais parecido. Esses dispensam a confirmação falada.
+        """
+        limiar = carregar_config_geral().get("limiar_confianca_voz", 90)
+        prefixo, acao = separar_prefixo(texto)
+        if not limiar or self.active_assistant != "desktop" or prefixo not in (None, "pc"):
+            return None
+        avaliacao = avaliar_comando_desktop(acao, cache)
+        if avaliacao and avaliacao["score"] >= limiar and avaliacao["margem"] >= MARGEM_MINIMA_VOZ:
+            return avaliacao
+        return None
+
+    def _aceitar_parcial_confiante(self) -> Callable[[str], bool]:
+        """Aceita o parcial quando a mesma intenção confiante se mantém por ESTABILIDADE_PARCIAL_VOZ segundos."""
+        estado = {"intencao": None, "desde": 0.0}
+
+        def aceitar(parcial: str) -> bool:
+            avaliacao = self._intencao_confiante(parcial, intent_cache_parcial)
+            intencao = avaliacao["intencao"] if avaliacao else None
+            agora = time.monotonic()
+            if intencao != estado["intencao"]:
+                estado["intencao"], estado["desde"] = intencao, agora
+                return False
+            return intencao is not None and agora - estado["desde"] >= ESTABILIDADE_PARCIAL_VOZ
+        return aceitar
+
+    def _comando_para_despacho(self, texto: str) -> str:
+        """
+        Formato único do que vai para o bot_main, venha o texto de um parcial aceito ou de uma confirmação:
+        prefixo falado vira "prefixo, ação"; sem prefixo, um comando de desktop reconhecido ganha "pc, "
+        e o resto (ex.: "pausar", "3", "historico") segue como foi dito.
+        """
+        prefixo, acao = separar_prefixo(texto)
+        if prefixo is None and self.active_assistant == "desktop" and interpretar_comando_desktop(acao):
+            prefixo = "pc"
+        return f"{prefixo}, {acao}" if prefixo else acao
+
+    def _despachar(self, comando: str):
+        if self.active_assistant in self.command_queues:
+            self.command_queues[self.active_assistant].put(comando)
         else:
-            log_interface(f"Motor de TTS não disponível. Não foi possível falar: {text}", "voz")
+            log_interface(f"ERRO: Fila de comando para '{self.active_assistant}' não encontrada.", "error")
+
+    def speak(self, text: Union[str, Sequence[str]]) -> Optional[Fala]:
+        """Enfileira a fala e retorna na hora; use Fala.aguardar()/Fala.terminou para sincronizar."""
+        texto = text if isinstance(text, str) else " ".join(text)
+        if not self.tts.disponivel:
+            log_interface(f"Motor de TTS não disponível. Não foi possível falar: {texto}", "voz")
+            return None
+        self.ui_queue.put({"type": "log", "tag": "info", "message": f"Assistente: {texto}"})
+        return self.tts.falar(text)
 
     def start_listening_session(self, active_assistant: str):
         if self.is_listening:
@@ -53,6 +371,8 @@ class VoiceManager:
 
         self.active_assistant = active_assistant
         self.is_listening = True
+        # Atalho apertado enquanto o assistente fala: corta a fala e passa a ouvir
+        self.tts.interromper()
 
         thread = threading.Thread(target=self._listening_flow, daemon=True)
         thread.start()
@@ -63,18 +383,13 @@ class VoiceManager:
         """
         try:
             self.ui_queue.put({"type": "voice_status", "message": "Ouvindo..."})
-            with self.microphone as source:
-                try:
-                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                except sr.WaitTimeoutError:
-                    self.ui_queue.put({"type": "voice_status", "message": "Não ouvi nada. Tente novamente."})
-                    return
-
-            self.ui_queue.put({"type": "voice_status", "message": "Processando..."})
-
             try:
-                transcribed_text = self.recognizer.recognize_google(audio, language='pt-BR')
+                transcribed_text = self._ouvir(timeout=5, phrase_time_limit=10,
+                                               aceitar_parcial=self._aceitar_parcial_confiante())
                 self.ui_queue.put({"type": "voice_status", "message": f"Você disse: '{transcribed_text}'"})
+            except sr.WaitTimeoutError:
+                self.ui_queue.put({"type": "voice_status", "message": "Não ouvi nada. Tente novamente."})
+                return
             except sr.UnknownValueError:
                 self.ui_queue.put({"type": "voice_status", "message": "Não entendi. Pode repetir?"})
                 return
@@ -82,36 +397,41 @@ class VoiceManager:
                 self.ui_queue.put({"type": "voice_status", "message": f"Erro de serviço; {e}"})
                 return
 
+            # Comando de desktop inequívoco: despacha já, sem confirmação falada
+            avaliacao = self._intencao_confiante(transcribed_text)
+            if avaliacao:
+                nome = avaliacao["intencao"]["parametros"]["nome"]
+                self.ui_queue.put({"type": "voice_status", "message": f"Comando '{transcribed_text}' -> '{nome}' "
+                                                                      f"(confiança {avaliacao['score']}), executando."})
+                self._despachar(self._comando_para_despacho(transcribed_text))
+                return
+
             # Carrega a configuração para verificar se a confirmação é necessária
             config = carregar_config_geral()
             confirmacao_necessaria = config.get("confirmar_comando_voz", True)
             confirmado = False
 
             if confirmacao_necessaria:
-                time.sleep(0.5)
-                self.speak(f"Você disse: '{transcribed_text}'. Está correto?")
+                # O prompt toca em segundo plano; a escuta já lê o microfone e descarta o áudio até o fim dele
+                prompt = self.speak([FRASE_VOCE_DISSE, transcribed_text, FRASE_ESTA_CORRETO])
                 self.ui_queue.put({"type": "voice_status", "message": "Aguardando confirmação (diga 'sim')..."})
 
-                with self.microphone as source:
-                    try:
-                        audio_confirm = self.recognizer.listen(source, timeout=5, phrase_time_limit=3)
-                        confirm_text = self.recognizer.recognize_google(audio_confirm, language='pt-BR').lower()
-                        confirmation_words = ["ok", "sim", "correto", "isso", "confirmo", "exato"]
-                        if any(word in confirm_text for word in confirmation_words):
-                            confirmado = True
-                    except (sr.WaitTimeoutError, sr.UnknownValueError):
-                        self.ui_queue.put({"type": "voice_status", "message": "Confirmação não recebida. Comando cancelado."})
-                        return
+                try:
+                    confirm_text = self._ouvir(timeout=5, phrase_time_limit=3,
+                                               apos=prompt.terminou if prompt else None).lower()
+                    confirmation_words = ["ok", "sim", "correto", "isso", "confirmo", "exato"]
+                    if any(word in confirm_text for word in confirmation_words):
+                        confirmado = True
+                except (sr.WaitTimeoutError, sr.UnknownValueError, sr.RequestError):
+                    self.ui_queue.put({"type": "voice_status", "message": "Confirmação não recebida. Comando cancelado."})
+                    return
             else:
                 # Se a confirmação não for necessária, assume como confirmado.
                 confirmado = True
 
             if confirmado:
                 self.ui_queue.put({"type": "voice_status", "message": f"Comando '{transcribed_text}' confirmado!"})
-                if self.active_assistant in self.command_queues:
-                    self.command_queues[self.active_assistant].put(transcribed_text)
-                else:
-                    log_interface(f"ERRO: Fila de comando para '{self.active_assistant}' não encontrada.", "error")
+                self._despachar(self._comando_para_despacho(transcribed_text))
             else:
                 self.ui_queue.put({"type": "voice_status", "message": "Comando cancelado."})
 
@@ -136,6 +456,8 @@ class VoiceCore:
 
     def stop(self):
         self.running = False
+        self.manager.mic.stop()
+        self.manager.tts.fechar()
         log_interface("[VOZ] VoiceCore parado.", "voz")
 
     def start_listening(self, assistant="desktop"):
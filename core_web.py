@@ -1,10 +1,425 @@
 # core_web.py
-from core_utils import log_interface
+from core_utils import CONFIG_DIR, log_interface, carregar_config_geral, read_json_file, write_json_file
 import asyncio
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from functools import partial
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
 
 # Variável global para armazenar os links da última pesquisa
 ultimos_resultados_pesquisa = []
 
+# Bases das pesquisas; apontá-las para um servidor HTTP local (com /results e /search) permite testar com páginas fixas
+URL_YOUTUBE = "https://www.youtube.com"
+URL_GOOGLE = "https://www.google.com"
+
+SELETOR_RESULTADO_YT = 'ytd-video-renderer'
+SELETOR_RESULTADO_GOOGLE = 'div.g'
+
+# Extração feita inteira dentro da página: uma única ida e volta ao navegador, qualquer que seja N.
+# Recebe (elementos, n) e devolve até n objetos {titulo, url, duracao, canal}.
+JS_EXTRAIR_YT = """
+(els, n) => {
+    const texto = (el) => el ? el.textContent.trim() : null;
+    const itens = [];
+    for (const el of els) {
+        if (itens.length >= n) break;
+        const a = el.querySelector('a#video-title');
+        if (!a || !a.href) continue;
+        const titulo = (a.getAttribute('title') || a.textContent || '').trim();
+        if (!titulo) continue;
+        itens.push({
+            titulo,
+            url: a.href,
+            duracao: texto(el.querySelector('ytd-thumbnail-overlay-time-status-renderer #text, ytd-thumbnail-overlay-time-status-renderer .badge-shape-wiz__text')),
+            canal: texto(el.querySelector('ytd-channel-name #text, #channel-name a')),
+        });
+    }
+    return itens;
+}
+"""
+
+JS_EXTRAIR_GOOGLE = """
+(els, n) => {
+    const itens = [];
+    for (const el of els) {
+        if (itens.length >= n) break;
+        const h3 = el.querySelector('h3');
+        const a = el.querySelector('a');
+        if (!h3 || !a || !a.href) continue;
+        const titulo = h3.textContent.trim();
+        if (!titulo) continue;
+        let canal = null;
+        try { canal = new URL(a.href).hostname.replace(/^www\\./, ''); } catch (e) {}
+        itens.push({titulo, url: a.href, duracao: null, canal});
+    }
+    return itens;
+}
+"""
+
+class FastNavigationProfile:
+    """
+    Perfil opcional de navegação rápida (config.json -> "web_perfil_rapido": true), instalado com page.route()
+    só nas abas de busca do PagePool:
+    - nas páginas de busca (caminhos /results e /search) aborta imagens, mídia, fontes e requisições a
+      hosts/caminhos de anúncio e telemetria; o documento em si nunca é bloqueado
+    - o player e as abas de pré-carga não têm rota: a página do vídeo (/watch) não paga o roteamento
+      de cada requisição e continua usando o cache HTTP, que o Chromium desliga numa página roteada
+    """
+    TIPOS_BLOQUEADOS = ("image", "media", "font")
+    HOSTS_BLOQUEADOS = (
+        "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+        "googletagmanager.com", "adservice.google.com", "imasdk.googleapis.com",
+    )
+    CAMINHOS_BLOQUEADOS = ("/api/stats/", "/ptracking", "/pagead/", "/youtubei/v1/log_event", "/gen_204", "/generate_204")
+    PAGINAS_BUSCA = ("/results", "/search")
+
+    def __init__(self, tipos: Sequence[str] = TIPOS_BLOQUEADOS, hosts: Sequence[str] = HOSTS_BLOQUEADOS,
+                 caminhos: Sequence[str] = CAMINHOS_BLOQUEADOS, paginas_busca: Sequence[str] = PAGINAS_BUSCA):
+        self.tipos = set(tipos)
+        self.hosts = tuple(hosts)
+        self.caminhos = tuple(caminhos)
+        self.paginas_busca = tuple(paginas_busca)
+        self.bloqueadas = 0
+
+    def eh_pagina_de_busca(self, url: str) -> bool:
+        return urlparse(url).path.rstrip("/") in self.paginas_busca
+
+    def deve_bloquear(self, url: str, tipo: str, url_pagina: str) -> bool:
+        if tipo == "document" or not self.eh_pagina_de_busca(url_pagina):
+            return False
+        if tipo in self.tipos:
+            return True
+        alvo = urlparse(url)
+        host = alvo.hostname or ""
+        if any(host == h or host.endswith("." + h) for h in self.hosts):
+            return True
+        return any(alvo.path.startswith(c) for c in self.caminhos)
+
+    async def _rotear(self, route):
+        request = route.request
+        try:
+            url_pagina = request.frame.url
+        except Exception:
+            url_pagina = ""
+        if self.deve_bloquear(request.url, request.resource_type, url_pagina):
+            self.bloqueadas += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def instalar(self, page):
+        await page.route("**/*", self._rotear)
+
+perfil_navegacao: Optional[FastNavigationProfile] = None
+
+def ativar_perfil_rapido() -> FastNavigationProfile:
+    """Cria o perfil global; o PagePool o instala em cada aba de busca que abrir."""
+    global perfil_navegacao
+    perfil = FastNavigationProfile()
+    perfil_navegacao = perfil
+    log_interface("[WEB] Perfil de navegação rápida ativo nas páginas de busca.", "web")
+    return perfil
+
+async def navegar(page, url: str, seletor: Optional[str] = None, rotulo: str = "página"):
+    """
+    page.goto com o tempo de cada etapa no log. Com o perfil rápido ativo espera só o domcontentloaded
+    (mais o seletor de resultados, quando houver); sem ele mantém o comportamento original (evento load).
+    """
+    inicio = time.perf_counter()
+    bloqueadas_antes = perfil_navegacao.bloqueadas if perfil_navegacao else 0
+    if perfil_navegacao is not None:
+        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+    else:
+        await page.goto(url, timeout=60000)
+    carregou = time.perf_counter()
+    if seletor:
+        await page.wait_for_selector(seletor, timeout=10000)
+    fim = time.perf_counter()
+
+    detalhes = f"goto {(carregou - inicio) * 1000:.0f} ms"
+    if seletor:
+        detalhes += f", resultados {(fim - carregou) * 1000:.0f} ms"
+    if perfil_navegacao is not None:
+        detalhes += f", {perfil_navegacao.bloqueadas - bloqueadas_antes} requisições bloqueadas"
+    log_interface(f"[WEB] Navegação ({rotulo}) em {(fim - inicio) * 1000:.0f} ms ({detalhes}).", "web")
+
+MARCA_PRE_CARGA = "#assistente-pre-carga"
+
+# Instalado nas abas de pré-carga: enquanto a página carregada com a marca não for promovida, todo
+# vídeo que tentar tocar é pausado (eventos de mídia não borbulham, mas passam pela captura no document).
+JS_SEGURAR_PRE_CARGA = """
+window.__assistentePreCarga = location.hash === '#assistente-pre-carga';
+document.addEventListener('play', (e) => { if (window.__assistentePreCarga) e.target.pause(); }, true);
+"""
+
+JS_SOLTAR_PRE_CARGA = """
+() => {
+    window.__assistentePreCarga = false;
+    const video = document.querySelector('video');
+    if (video) video.play();
+}
+"""
+
+class PagePool:
+    """
+    Abas do contexto persistente usadas pelo bot_main.
+    - player: a aba do vídeo/link em reprodução; nunca é navegada por uma pesquisa
+    - aba(chave): abas de trabalho em segundo plano (ex.: "busca-yt"), reaproveitadas por chave; com o
+      perfil rápido ativo, cada uma recebe as rotas do FastNavigationProfile ao ser aberta
+    - pre_carregar(url): abre a página do vídeo numa aba escondida, pausada, para que tocar seja imediato;
+      promover(url) a transforma no novo player
+    O total de abas é limitado a `max_abas` (player incluído): a aba de trabalho usada há mais tempo é fechada.
+    """
+    def __init__(self, context, player, max_abas: int = 4):
+        self.context = context
+        self.player = player
+        self.max_abas = max(2, max_abas)
+        self._abas: "OrderedDict[str, object]" = OrderedDict()
+        self._pre_cargas: Dict[str, asyncio.Task] = {}
+
+    async def _nova_aba(self, chave: str):
+        while len(self._abas) >= self.max_abas - 1:
+            antiga, pagina = self._abas.popitem(last=False)
+            await self._fechar_aba(antiga, pagina)
+        pagina = await self.context.new_page()
+        if self.player.viewport_size:
+            await pagina.set_viewport_size(self.player.viewport_size)
+        await self.player.bring_to_front()  # a aba nova não pode tomar a frente do vídeo
+        self._abas[chave] = pagina
+        return pagina
+
+    async def _fechar_aba(self, chave: str, pagina):
+        tarefa = self._pre_cargas.pop(chave, None)
+        if tarefa is not None:
+            tarefa.cancel()
+        try:
+            await pagina.close()
+        except Exception:
+            pass
+
+    async def aba(self, chave: str):
+        pagina = self._abas.get(chave)
+        if pagina is None or pagina.is_closed():
+            self._abas.pop(chave, None)
+            pagina = await self._nova_aba(chave)
+            if perfil_navegacao is not None:
+                await perfil_navegacao.instalar(pagina)
+            return pagina
+        self._abas.move_to_end(chave)
+        return pagina
+
+    async def pre_carregar(self, url: str):
+        """Dispara a pré-carga em segundo plano e retorna na hora."""
+        if url in self._abas:
+            self._abas.move_to_end(url)
+            return
+        pagina = await self._nova_aba(url)
+        await pagina.add_init_script(JS_SEGURAR_PRE_CARGA)
+        self._pre_cargas[url] = asyncio.create_task(self._carregar(pagina, url))
+
+    async def _carregar(self, pagina, url: str):
+        try:
+            await navegar(pagina, url + MARCA_PRE_CARGA, rotulo="pré-carga")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log_interface(f"[WEB] Pré-carga de '{url}' falhou: {e}", "warning")
+
+    async def promover(self, url: str):
+        """Se `url` foi pré-carregada, libera o vídeo, traz a aba para a frente e a torna o player."""
+        pagina = self._abas.pop(url, None)
+        if pagina is None:
+            return None
+        tarefa = self._pre_cargas.pop(url, None)
+        try:
+            if tarefa is not None:
+                await tarefa
+            await pagina.evaluate(JS_SOLTAR_PRE_CARGA)
+            await pagina.bring_to_front()
+        except Exception as e:
+            log_interface(f"[WEB] Aba pré-carregada indisponível ({e}); navegando normalmente.", "warning")
+            await self._fechar_aba(url, pagina)
+            return None
+        antigo, self.player = self.player, pagina
+        try:
+            await antigo.close()
+        except Exception:
+            pass
+        return pagina
+
+    async def fechar(self):
+        for chave, pagina in list(self._abas.items()):
+            await self._fechar_aba(chave, pagina)
+        self._abas.clear()
+
+def numero_de_resultados() -> int:
+    """Quantos resultados listar por pesquisa (config.json -> web_num_resultados, padrão 5)."""
+    try:
+        return max(1, int(carregar_config_geral().get("web_num_resultados", 5)))
+    except (TypeError, ValueError):
+        return 5
+
+SEARCH_CACHE_JSON = CONFIG_DIR / 'search_cache.json'
+
+class SearchCache:
+    """
+    Cache persistente (search_cache.json) de pesquisa -> lista de resultados.
+    - chave: tipo ("yt"/"web") + termo normalizado, então "Gatos!" e "gatos" são a mesma pesquisa
+    - cada entrada vale `ttl` segundos; acima de `max_entradas` sai a usada há mais tempo
+    - uma entrada feita com menos resultados do que os pedidos agora conta como ausente
+    """
+    def __init__(self, path: Path = SEARCH_CACHE_JSON, ttl: float = 6 * 3600, max_entradas: int = 200):
+        self.path = path
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._entradas: "Optional[OrderedDict[str, Dict]]" = None
+
+    @staticmethod
+    def chave(tipo: str, termo: str) -> str:
+        texto = unicodedata.normalize("NFKD", termo.lower())
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+        texto = " ".join(re.sub(r"[^\w\s]", " ", texto).split())
+        return f"{tipo}:{texto}"
+
+    def _carregar(self) -> "OrderedDict[str, Dict]":
+        if self._entradas is None:
+            dados = read_json_file(self.path, {})
+            self._entradas = OrderedDict(sorted(dados.items(), key=lambda kv: kv[1].get("usado", 0)))
+        return self._entradas
+
+    def get(self, tipo: str, termo: str, n: int) -> Optional[Tuple[List[Dict], float]]:
+        """(resultados, idade em segundos) ou None se ausente/expirado."""
+        entradas = self._carregar()
+        chave = self.chave(tipo, termo)
+        entrada = entradas.get(chave)
+        if entrada is None:
+            return None
+        idade = time.time() - entrada["ts"]
+        if idade > self.ttl or entrada.get("n", 0) < n:
+            return None
+        entrada["usado"] = time.time()
+        entradas.move_to_end(chave)
+        return entrada["resultados"][:n], idade
+
+    def put(self, tipo: str, termo: str, n: int, resultados: List[Dict]):
+        if not resultados:
+            return
+        entradas = self._carregar()
+        agora = time.time()
+        chave = self.chave(tipo, termo)
+        entradas[chave] = {"ts": agora, "usado": agora, "n": n, "resultados": resultados}
+        entradas.move_to_end(chave)
+        for antiga in [c for c, e in entradas.items() if agora - e["ts"] > self.ttl]:
+            del entradas[antiga]
+        while len(entradas) > self.max_entradas:
+            entradas.popitem(last=False)
+        write_json_file(self.path, dict(entradas))
+
+class ResultHistory:
+    """Conjuntos de resultados desta sessão: 1 é o mais recente. Repetir uma pesquisa a traz de volta ao topo."""
+    def __init__(self, max_conjuntos: int = 5):
+        self._conjuntos: "deque[Dict]" = deque(maxlen=max_conjuntos)
+
+    def adicionar(self, tipo: str, termo: str, resultados: List[Dict]):
+        chave = SearchCache.chave(tipo, termo)
+        for conjunto in list(self._conjuntos):
+            if conjunto["chave"] == chave:
+                self._conjuntos.remove(conjunto)
+        self._conjuntos.appendleft({"chave": chave, "tipo": tipo, "termo": termo,
+                                    "resultados": [{"tipo": tipo, **r} for r in resultados]})
+
+    def conjunto(self, indice: int) -> Optional[Dict]:
+        if 1 <= indice <= len(self._conjuntos):
+            return self._conjuntos[indice - 1]
+        return None
+
+    def __iter__(self):
+        return iter(self._conjuntos)
+
+cache_pesquisas = SearchCache()
+historico_pesquisas = ResultHistory()
+
+# Hits mais velhos que isto disparam uma nova busca em segundo plano para o próximo acesso
+ATUALIZAR_CACHE_APOS = 60.0
+
+TEXTOS_RESULTADOS = {
+    "yt": ("--- Resultados da Pesquisa no YouTube ---", "Para tocar um vídeo, digite apenas o número."),
+    "web": ("--- Resultados da Pesquisa na Web ---", "Para abrir um link, digite apenas o número."),
+}
+
+_trava_busca = asyncio.Lock()
+_tarefas_fundo = set()
+
+def _mostrar_resultados(tipo: str, termo: str, resultados: List[Dict]):
+    historico_pesquisas.adicionar(tipo, termo, resultados)
+    ultimos_resultados_pesquisa[:] = historico_pesquisas.conjunto(1)["resultados"]
+    cabecalho, dica = TEXTOS_RESULTADOS[tipo]
+    log_interface(cabecalho, "success")
+    for i, item in enumerate(resultados):
+        detalhes = ", ".join(d for d in (item.get("canal"), item.get("duracao")) if d)
+        log_interface(f"{i + 1}: {item['titulo']}" + (f" ({detalhes})" if detalhes else ""), "info")
+    log_interface(dica, "info")
+
+async def _atualizar_cache(tipo: str, termo: str, n: int, buscar: Callable[[str, int], Awaitable[List[Dict]]]):
+    try:
+        async with _trava_busca:
+            cache_pesquisas.put(tipo, termo, n, await buscar(termo, n))
+    except Exception as e:
+        log_interface(f"[WEB] Não foi possível atualizar o cache de '{termo}': {e}", "warning")
+
+async def _pesquisar(tipo: str, termo: str, buscar: Callable[[str, int], Awaitable[List[Dict]]]) -> List[Dict]:
+    """Serve do cache quando possível (atualizando-o em segundo plano) e registra o conjunto no histórico."""
+    n = numero_de_resultados()
+    em_cache = cache_pesquisas.get(tipo, termo, n)
+    if em_cache is not None:
+        resultados, idade = em_cache
+        log_interface(f"[WEB] Resultados em cache (de {idade:.0f} s atrás).", "web")
+        _mostrar_resultados(tipo, termo, resultados)
+        if idade >= ATUALIZAR_CACHE_APOS:
+            tarefa = asyncio.create_task(_atualizar_cache(tipo, termo, n, buscar))
+            _tarefas_fundo.add(tarefa)
+            tarefa.add_done_callback(_tarefas_fundo.discard)
+        return resultados
+
+    async with _trava_busca:
+        resultados = await buscar(termo, n)
+    cache_pesquisas.put(tipo, termo, n, resultados)
+    _mostrar_resultados(tipo, termo, resultados)
+    return resultados
+
+def selecionar_conjunto(indice: int) -> bool:
+    """Torna o conjunto `indice` do histórico (1 = mais recente) o alvo dos números digitados."""
+    conjunto = historico_pesquisas.conjunto(indice)
+    if conjunto is None:
+        log_interface(f"[WEB] Não há conjunto de resultados {indice} no histórico.", "warning")
+        return False
+    ultimos_resultados_pesquisa[:] = conjunto["resultados"]
+    return True
+
+def listar_historico():
+    conjuntos = list(historico_pesquisas)
+    if not conjuntos:
+        log_interface("Nenhuma pesquisa feita nesta sessão.", "info")
+        return
+    log_interface("--- Pesquisas Recentes ---", "success")
+    for i, conjunto in enumerate(conjuntos):
+        origem = "YouTube" if conjunto["tipo"] == "yt" else "Web"
+        log_interface(f"{i + 1}: [{origem}] '{conjunto['termo']}' ({len(conjunto['resultados'])} resultados)", "info")
+    log_interface("Para usar um resultado antigo, digite <pesquisa>.<número> (ex.: 2.1).", "info")
+
 async def pausar_video(page):
     """Pressiona a tecla 'k' para pausar/retomar vídeos (padrão YouTube)."""
     try:
@@ -21,74 +436,216 @@ async def retomar_video(page):
     except Exception as e:
         log_interface(f"[WEB] Erro ao enviar comando de play/resume: {e}", "error")
 
-async def pesquisar_youtube(termo: str, page):
-    global ultimos_resultados_pesquisa
-    ultimos_resultados_pesquisa.clear()
+async def _buscar_youtube(page, termo: str, n: int) -> List[Dict]:
+    url_pesquisa = f"{URL_YOUTUBE}/results?search_query={quote_plus(termo)}"
+    await navegar(page, url_pesquisa, SELETOR_RESULTADO_YT, "busca YouTube")
+    return await page.eval_on_selector_all(SELETOR_RESULTADO_YT, JS_EXTRAIR_YT, n)
+
+async def _buscar_google(page, termo: str, n: int) -> List[Dict]:
+    url_pesquisa = f"{URL_GOOGLE}/search?q={quote_plus(termo)}&hl=pt-BR"
+    await navegar(page, url_pesquisa, SELETOR_RESULTADO_GOOGLE, "busca Google")
+    return await page.eval_on_selector_all(SELETOR_RESULTADO_GOOGLE, JS_EXTRAIR_GOOGLE, n)
+
+_RE_YT_INITIAL_DATA = re.compile(r"""(?:var\s+ytInitialData|window\[["']ytInitialData["']\])\s*=\s*""")
+
+def _procurar_chave(no: Any, chave: str) -> Iterator[Dict]:
+    """Todos os valores de `chave` em qualquer profundidade do JSON, na ordem do documento."""
+    if isinstance(no, dict):
+        for k, v in no.items():
+            if k == chave and isinstance(v, dict):
+                yield v
+            else:
+                yield from _procurar_chave(v, chave)
+    elif isinstance(no, list):
+        for v in no:
+            yield from _procurar_chave(v, chave)
+
+def _texto_yt(campo: Optional[Dict]) -> Optional[str]:
+    if not campo:
+        return None
+    if "simpleText" in campo:
+        return campo["simpleText"].strip()
+    texto = "".join(r.get("text", "") for r in campo.get("runs", ())).strip()
+    return texto or None
+
+def extrair_resultados_yt_html(html: str, n: int) -> List[Dict]:
+    """Lê os vídeos do ytInitialData embutido na página de resultados do YouTube (sem renderizar nada)."""
+    m = _RE_YT_INITIAL_DATA.search(html)
+    if not m:
+        return []
+    dados, _ = json.JSONDecoder().raw_decode(html, m.end())
+    itens = []
+    for video in _procurar_chave(dados, "videoRenderer"):
+        titulo = _texto_yt(video.get("title"))
+        if not video.get("videoId") or not titulo:
+            continue
+        itens.append({
+            "titulo": titulo,
+            "url": f"{URL_YOUTUBE}/watch?v={video['videoId']}",
+            "duracao": _texto_yt(video.get("lengthText")),
+            "canal": _texto_yt(video.get("ownerText") or video.get("longBylineText")),
+        })
+        if len(itens) >= n:
+            break
+    return itens
+
+class _GoogleResultParser(HTMLParser):
+    """Links de resultado do Google: um <a href> com um <h3> (o título) dentro."""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[Tuple[str, str]] = []
+        self._href: Optional[str] = None
+        self._em_h3 = False
+        self._titulo: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self._href = dict(attrs).get("href")
+            self._titulo = []
+        elif tag == "h3" and self._href:
+            self._em_h3 = True
+
+    def handle_endtag(self, tag):
+        if tag == "h3":
+            self._em_h3 = False
+        elif tag == "a" and self._href:
+            titulo = " ".join("".join(self._titulo).split())
+            if titulo:
+                self.links.append((self._href, titulo))
+            self._href = None
+
+    def handle_data(self, data):
+        if self._em_h3:
+            self._titulo.append(data)
+
+def extrair_resultados_google_html(html: str, n: int) -> List[Dict]:
+    """Resultados orgânicos do HTML do Google; links de redirecionamento (/url?q=) são desembrulhados."""
+    parser = _GoogleResultParser()
+    parser.feed(html)
+    itens, vistos = [], set()
+    for href, titulo in parser.links:
+        if href.startswith("/url?"):
+            query = parse_qs(urlparse(href).query)
+            href = (query.get("q") or query.get("url") or [""])[0]
+        alvo = urlparse(href)
+        host = alvo.hostname or ""
+        if alvo.scheme not in ("http", "https") or host.startswith("google.") or ".google." in host or href in vistos:
+            continue
+        vistos.add(href)
+        itens.append({"titulo": titulo, "url": href, "duracao": None, "canal": host[4:] if host.startswith("www.") else host})
+        if len(itens) >= n:
+            break
+    return itens
+
+class SearchBackend:
+    """Interface das pesquisas: buscar(tipo, termo, n) -> até n itens {titulo, url, duracao, canal}."""
+    nome = "base"
+
+    async def buscar(self, tipo: str, termo: str, n: int) -> List[Dict]:
+        raise NotImplementedError
+
+    async def fechar(self):
+        pass
+
+class PlaywrightSearchBackend(SearchBackend):
+    """Pesquisa renderizando a página no Chromium; obter_aba(chave) devolve a aba de fundo a usar."""
+    nome = "playwright"
+
+    def __init__(self, obter_aba: Callable[[str], Awaitable[Any]]):
+        self.obter_aba = obter_aba
+
+    async def buscar(self, tipo: str, termo: str, n: int) -> List[Dict]:
+        page = await self.obter_aba(f"busca-{tipo}")
+        if tipo == "yt":
+            return await _buscar_youtube(page, termo, n)
+        return await _buscar_google(page, termo, n)
+
+class LiteSearchBackend(SearchBackend):
+    """
+    Pesquisa sem navegador (config.json -> "web_backend": "lite"): baixa a página de resultados com uma
+    requests.Session (conexões keep-alive reaproveitadas) e extrai os itens do HTML/JSON embutido.
+    O Google pode exigir JavaScript para algumas consultas; nesse caso a lista volta vazia e o log avisa.
+    """
+    nome = "lite"
+    CABECALHOS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+        "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+    }
+    COOKIES = {"SOCS": "CAI"}  # evita a página de consentimento de cookies do YouTube/Google
+
+    def __init__(self, timeout: float = 10.0):
+        if requests is None:
+            raise RuntimeError("requests não está instalado (pip install requests).")
+        self.timeout = timeout
+        self._sessao = requests.Session()
+        self._sessao.headers.update(self.CABECALHOS)
+        self._sessao.cookies.update(self.COOKIES)
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self._sessao.mount("http://", adaptador)
+        self._sessao.mount("https://", adaptador)
+
+    def _baixar(self, url: str, params: Dict, rotulo: str) -> str:
+        inicio = time.perf_counter()
+        resposta = self._sessao.get(url, params=params, timeout=self.timeout)
+        resposta.raise_for_status()
+        log_interface(f"[WEB] Requisição ({rotulo}) em {(time.perf_counter() - inicio) * 1000:.0f} ms "
+                      f"({len(resposta.content) // 1024} KB).", "web")
+        return resposta.text
+
+    def _buscar(self, tipo: str, termo: str, n: int) -> List[Dict]:
+        if tipo == "yt":
+            html = self._baixar(f"{URL_YOUTUBE}/results", {"search_query": termo}, "busca YouTube lite")
+            return extrair_resultados_yt_html(html, n)
+        html = self._baixar(f"{URL_GOOGLE}/search", {"q": termo, "hl": "pt-BR", "gbv": "1"}, "busca Google lite")
+        itens = extrair_resultados_google_html(html, n)
+        if not itens:
+            log_interface("[WEB] O Google não devolveu resultados legíveis sem navegador; tente web_backend=playwright.", "warning")
+        return itens
+
+    async def buscar(self, tipo: str, termo: str, n: int) -> List[Dict]:
+        return await asyncio.to_thread(self._buscar, tipo, termo, n)
+
+    async def fechar(self):
+        self._sessao.close()
+
+def criar_backend_pesquisa(nome: str, obter_aba: Callable[[str], Awaitable[Any]]) -> SearchBackend:
+    if nome == "lite":
+        try:
+            return LiteSearchBackend()
+        except RuntimeError as e:
+            log_interface(f"[WEB] Modo lite indisponível ({e}); usando o Playwright.", "warning")
+    return PlaywrightSearchBackend(obter_aba)
+
+async def pesquisar_youtube(termo: str, backend: SearchBackend):
     try:
         log_interface(f"[WEB] Pesquisando no YouTube por: '{termo}'", "web")
-        termo_formatado = termo.replace(' ', '+')
-        url_pesquisa = f"https://www.youtube.com/results?search_query={termo_formatado}"
-        await page.goto(url_pesquisa, timeout=60000)
-
-        await page.wait_for_selector('ytd-video-renderer', timeout=10000)
-        videos = await page.locator('ytd-video-renderer').all()
-
-        log_interface("--- Resultados da Pesquisa no YouTube ---", "success")
-        for i, video in enumerate(videos[:5]):
-            titulo = await video.locator('#video-title').inner_text()
-            link = await video.locator('a#video-title').get_attribute('href')
-            url_completa = f"https://www.youtube.com{link}"
-            
-            ultimos_resultados_pesquisa.append({"tipo": "yt", "url": url_completa})
-            log_interface(f"{i + 1}: {titulo}", "info")
-        
-        log_interface("Para tocar um vídeo, digite apenas o número.", "info")
-
+        return await _pesquisar("yt", termo, partial(backend.buscar, "yt"))
     except Exception as e:
         log_interface(f"[WEB] Erro ao pesquisar no YouTube ou extrair resultados: {e}", "error")
+        return []
 
-async def pesquisar_google(termo: str, page):
-    global ultimos_resultados_pesquisa
-    ultimos_resultados_pesquisa.clear()
+async def pesquisar_google(termo: str, backend: SearchBackend):
     try:
         log_interface(f"[WEB] Pesquisando no Google por: '{termo}'", "web")
-        url_pesquisa = f"https://www.google.com/search?q={termo.replace(' ', '+')}&hl=pt-BR"
-        await page.goto(url_pesquisa, timeout=60000)
-        
-        await page.wait_for_selector('div.g', timeout=10000)
-        resultados = await page.locator('div.g').all()
-        
-        log_interface("--- Resultados da Pesquisa na Web ---", "success")
-        for i, res in enumerate(resultados[:5]):
-            try:
-                titulo_element = await res.locator('h3').first
-                link_element = await res.locator('a').first
-                titulo = await titulo_element.inner_text()
-                link = await link_element.get_attribute('href')
-                if titulo and link:
-                    ultimos_resultados_pesquisa.append({"tipo": "web", "url": link})
-                    log_interface(f"{i + 1}: {titulo}", "info")
-            except Exception:
-                continue
-        
-        log_interface("Para abrir um link, digite apenas o número.", "info")
-
+        return await _pesquisar("web", termo, partial(backend.buscar, "web"))
     except Exception as e:
         log_interface(f"[WEB] Erro ao pesquisar no Google ou extrair resultados: {e}", "error")
+        return []
 
-async def tocar_video_youtube(numero: int, page):
+async def tocar_video_youtube(numero: int, page, pool: Optional[PagePool] = None):
     global ultimos_resultados_pesquisa
     try:
         index = numero - 1
         if 0 <= index < len(ultimos_resultados_pesquisa) and ultimos_resultados_pesquisa[index]["tipo"] == "yt":
             resultado = ultimos_resultados_pesquisa[index]
             log_interface(f"[WEB] Tocando vídeo {numero}...", "web")
-            await page.goto(resultado["url"], timeout=60000)
+            if pool is not None and await pool.promover(resultado["url"]):
+                log_interface(f"[WEB] Vídeo {numero} já estava pré-carregado.", "web")
+                return True
+            await navegar(page, resultado["url"], rotulo="vídeo")
             
             await asyncio.sleep(2)
             await page.keyboard.press("k")
-            
-            ultimos_resultados_pesquisa.clear()
             return True
     except Exception as e:
         log_interface(f"[WEB] Erro ao tentar tocar o vídeo {numero}: {e}", "error")
@@ -103,8 +660,7 @@ async def abrir_link_web(numero: int, page):
         if 0 <= index < len(ultimos_resultados_pesquisa) and ultimos_resultados_pesquisa[index]["tipo"] == "web":
             resultado = ultimos_resultados_pesquisa[index]
             log_interface(f"[WEB] Abrindo link {numero}...", "web")
-            await page.goto(resultado["url"], timeout=60000)
-            ultimos_resultados_pesquisa.clear()
+            await navegar(page, resultado["url"], rotulo="link")
             return True
     except Exception as e:
         log_interface(f"[WEB] Erro ao tentar abrir o link {numero}: {e}", "error")
@@ -0,0 +1,149 @@
+"""
+Confere a extração das pesquisas contra páginas de resultados salvas, sem rede.
+Sobe um http.server local que responde /results (YouTube) e /search (Google; com gbv=1 devolve a
+versão HTML básica), aponta core_web.URL_YOUTUBE/URL_GOOGLE para ele e roda o backend de pesquisa.
+
+Uso (a partir da raiz do projeto):
+    python fixtures_web/checar_busca.py            # modo lite (requests), compara com o esperado
+    python fixtures_web/checar_busca.py --playwright [--perfil]
+                                                   # Chromium headless pelas abas do PagePool; --perfil
+                                                   # ativa o FastNavigationProfile e confere que só as
+                                                   # abas de busca são roteadas
+    python fixtures_web/checar_busca.py --servir   # só serve as páginas, para testar à mão
+"""
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+PASTA = Path(__file__).resolve().parent
+sys.path.insert(0, str(PASTA.parent))
+
+import core_web
+
+PAGINAS = {
+    "/results": "youtube_results.html",
+    "/search": "google_search.html",
+}
+PAGINA_GOOGLE_BASICO = "google_search_basico.html"
+
+# (título, caminho/url) esperados em cada página, na ordem
+ESPERADO_YT = [
+    ("Gatos engraçados 2024 - compilação", "/watch?v=dQw4w9WgXcQ"),
+    ("Gatinhos dormindo </script> 1 hora de ronrono", "/watch?v=a1B2c3D4e5F"),
+    ("Por que os gatos derrubam coisas?", "/watch?v=Zz9Yy8Xx7Ww"),
+]
+ESPERADO_GOOGLE = [
+    ("Welcome to Python.org", "https://www.python.org/"),
+    ("Python – Wikipédia, a enciclopédia livre", "https://pt.wikipedia.org/wiki/Python"),
+    ("O tutorial de Python & documentação 3.12", "https://docs.python.org/pt-br/3/tutorial/"),
+]
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        nome = PAGINAS.get(url.path)
+        if url.path == "/search" and parse_qs(url.query).get("gbv") == ["1"]:
+            nome = PAGINA_GOOGLE_BASICO
+        if nome is None:
+            self.send_error(404)
+            return
+        corpo = (PASTA / nome).read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar_servidor(porta: int = 0) -> ThreadingHTTPServer:
+    """Serve as páginas em 127.0.0.1 e aponta as bases de pesquisa do core_web para lá."""
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), FixtureHandler)
+    threading.Thread(target=servidor.serve_forever, daemon=True, name="FixtureServer").start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    core_web.URL_YOUTUBE = base
+    core_web.URL_GOOGLE = base
+    return servidor
+
+
+def conferir(rotulo: str, obtidos, esperado, base: str) -> bool:
+    pares = [(r["titulo"], r["url"]) for r in obtidos]
+    alvo = [(t, base + u if u.startswith("/") else u) for t, u in esperado]
+    if pares == alvo:
+        print(f"OK   {rotulo}: {len(pares)} resultados")
+        return True
+    print(f"FALHA {rotulo}:\n  obtido:   {pares}\n  esperado: {alvo}")
+    return False
+
+
+async def checar_lite(base: str) -> bool:
+    backend = core_web.LiteSearchBackend(timeout=5.0)
+    try:
+        yt = await backend.buscar("yt", "gatos", len(ESPERADO_YT))
+        web = await backend.buscar("web", "python", len(ESPERADO_GOOGLE))
+    finally:
+        await backend.fechar()
+    return all([conferir("lite YouTube", yt, ESPERADO_YT, base),
+                conferir("lite Google", web, ESPERADO_GOOGLE, base)])
+
+
+async def checar_playwright(base: str, perfil: bool) -> bool:
+    from playwright.async_api import async_playwright
+    if perfil:
+        core_web.ativar_perfil_rapido()
+    async with async_playwright() as p:
+        navegador = await p.chromium.launch(headless=True)
+        context = await navegador.new_context()
+        player = await context.new_page()
+        pool = core_web.PagePool(context, player)
+        backend = core_web.PlaywrightSearchBackend(pool.aba)
+        try:
+            yt = await backend.buscar("yt", "gatos", len(ESPERADO_YT))
+            web = await backend.buscar("web", "python", len(ESPERADO_GOOGLE))
+            ok = all([conferir("playwright YouTube", yt, ESPERADO_YT, base),
+                      conferir("playwright Google", web, ESPERADO_GOOGLE, base)])
+            if perfil:
+                bloqueadas = core_web.perfil_navegacao.bloqueadas
+                # O player fica fora do perfil: a mesma página carregada nele não pode ter nada bloqueado
+                await core_web.navegar(player, f"{base}/results?search_query=gatos", rotulo="player")
+                ok &= conferir_perfil(bloqueadas, core_web.perfil_navegacao.bloqueadas - bloqueadas)
+            return ok
+        finally:
+            await pool.fechar()
+            await navegador.close()
+
+
+def conferir_perfil(nas_buscas: int, no_player: int) -> bool:
+    if nas_buscas > 0 and no_player == 0:
+        print(f"OK   perfil rápido: {nas_buscas} requisições bloqueadas nas abas de busca, nenhuma no player")
+        return True
+    print(f"FALHA perfil rápido: {nas_buscas} bloqueadas nas abas de busca, {no_player} no player")
+    return False
+
+
+def main(args) -> int:
+    servidor = iniciar_servidor()
+    base = core_web.URL_YOUTUBE
+    try:
+        if "--servir" in args:
+            print(f"Servindo em {base}/results?search_query=gatos e {base}/search?q=python (Ctrl+C encerra).")
+            threading.Event().wait()
+        if "--playwright" in args:
+            ok = asyncio.run(checar_playwright(base, perfil="--perfil" in args))
+        else:
+            ok = asyncio.run(checar_lite(base))
+        return 0 if ok else 1
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,7 +1,9 @@
 import json
 import os
 
-ARQUIVO_JSON = 'apps.json'
+from core_utils import APPS_JSON, salvar_config_apps
+
+ARQUIVO_JSON = str(APPS_JSON)
 
 def carregar_dados():
     """Carrega os dados do arquivo JSON."""
@@ -18,13 +20,9 @@ def carregar_dados():
         return {"apps_locais": {}, "sites_conhecidos": {}}
 
 def salvar_dados(dados):
-    """Salva os dados no arquivo JSON."""
-    try:
-        with open(ARQUIVO_JSON, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"ERRO CRÍTICO ao salvar {ARQUIVO_JSON}: {e}")
-        raise e # Propaga o erro para ser tratado pela UI
+    """Salva os dados no arquivo JSON (gravação atômica) e publica a nova versão para quem assina o catálogo."""
+    if not salvar_config_apps(dados):
+        raise OSError(f"Não foi possível gravar {ARQUIVO_JSON}.") # Propaga o erro para ser tratado pela UI
 
 def adicionar_app(nome, caminho, sinonimos=[]):
     """Adiciona um novo aplicativo ao JSON."""
@@ -1,8 +1,7 @@
 # gui_app_manager.py
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from core_utils import carregar_config_apps, log_interface, expandir_caminho
-import core_utils # Importando o módulo para ter acesso às funções de salvar
+from core_utils import carregar_config_apps, copiar_config_apps, salvar_config_apps, log_interface, expandir_caminho
 
 class AppManagerWindow(ctk.CTkToplevel):
     def __init__(self, master):
@@ -60,13 +59,15 @@ class AppManagerWindow(ctk.CTkToplevel):
         if not messagebox.askyesno("Confirmar Exclusão", f"Tem certeza que deseja excluir '{apelido}'?"):
             return
 
-        config = carregar_config_apps()
+        config = copiar_config_apps()
         if entry_type == "app":
             if apelido in config["apps_locais"]:
                 del config["apps_locais"][apelido]
-                core_utils.write_json_file(core_utils.APPS_JSON, config)
-                log_interface(f"[MANAGER] App '{apelido}' excluído com sucesso.", "success")
-                self.populate_app_list() # Atualiza a lista na tela
+                if salvar_config_apps(config):
+                    log_interface(f"[MANAGER] App '{apelido}' excluído com sucesso.", "success")
+                    self.populate_app_list() # Atualiza a lista na tela
+                else:
+                    messagebox.showerror("Erro", "Não foi possível gravar o apps.json.")
             else:
                 log_interface(f"[MANAGER] Erro: App '{apelido}' não encontrado para exclusão.", "error")
 
@@ -129,7 +130,7 @@ class AddAppDialog(ctk.CTkToplevel):
             messagebox.showerror("Erro", "Todos os campos devem ser preenchidos.")
             return
 
-        config = carregar_config_apps()
+        config = copiar_config_apps()
         if apelido in config["apps_locais"]:
             messagebox.showerror("Erro", f"O apelido '{apelido}' já existe.")
             return
@@ -139,6 +140,8 @@ class AddAppDialog(ctk.CTkToplevel):
             "executavel": executavel
         }
 
-        core_utils.write_json_file(core_utils.APPS_JSON, config)
+        if not salvar_config_apps(config):
+            messagebox.showerror("Erro", "Não foi possível gravar o apps.json.")
+            return
         log_interface(f"[MANAGER] App '{apelido}' adicionado com sucesso!", "success")
         self.destroy()
\ No newline at end of file
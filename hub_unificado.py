@@ -16,15 +16,16 @@ import itertools
 if os.name == "nt":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-from core_utils import log_queue, log_interface, carregar_status, update_status, adicionar_sinonimo
+from core_utils import log_queue, log_interface, carregar_status, carregar_config_geral, update_status, status_bus, adicionar_sinonimo
 from core_desktop import abrir_app_desktop, abrir_site_known, interpretar_comando_desktop, fechar_app, extrair_palavra_chave
-from core_web import pesquisar_youtube, pesquisar_google, tocar_video_youtube, abrir_link_web, pausar_video, retomar_video
+from core_web import pesquisar_youtube, pesquisar_google, tocar_video_youtube, abrir_link_web, pausar_video, retomar_video, ativar_perfil_rapido, PagePool, selecionar_conjunto, listar_historico, criar_backend_pesquisa
 from core_voice import VoiceCore
-from core_vigia import VigiaManager
+from core_vigia import VigiaManager, VigiaGovernor, criar_orcamento
 from gui_app_manager import AppManagerWindow
 from gui_overlay import OverlayWindow
 from gui_learning_dialog import LearningDialog
 from core_monitor import PCMonitor
+from core_scheduler import CommandScheduler, PRIORIDADE_ALTA, PRIORIDADE_NORMAL
 
 
 async_command_queue = asyncio.Queue()
@@ -57,8 +58,10 @@ class AssistenteMestreGUI(ctk.CTk):
         status_frame.grid(row=0, column=0, columnspan=3, sticky="ew", padx=10, pady=(10, 0))
         status_frame.grid_columnconfigure(0, weight=1)
         status = carregar_status()
-        self.status_label = ctk.CTkLabel(status_frame, text=f"Estado: {status.get('estado')} | Processo: {status.get('processo_ativo')}", anchor="w")
+        self.status_label = ctk.CTkLabel(status_frame, text=self._texto_status(status), anchor="w")
         self.status_label.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
+        self._status_pendente = None
+        status_bus.assinar(self._on_status_change)
 
         self.log_area = scrolledtext.ScrolledText(self, state='disabled', wrap=tk.WORD, bg="#2b2b2b", fg="#d3d3d3", font=("Helvetica", 10))
         self.log_area.grid(row=1, column=0, columnspan=3, sticky="nsew", padx=10, pady=10)
@@ -199,13 +202,22 @@ class AssistenteMestreGUI(ctk.CTk):
         except Exception as e:
             print(f"Erro no log: {e}")
 
+    @staticmethod
+    def _texto_status(status):
+        return f"Estado: {status.get('estado')} | Processo: {status.get('processo_ativo')} | Vigia: {status.get('vigia_orcamento', 'completo')}"
+
+    def _on_status_change(self, status):
+        # Chamado na thread que publicou o status; a label é atualizada no próximo tick da GUI.
+        self._status_pendente = status
+
     def drain_log_queue(self):
         try:
             while not log_queue.empty():
                 entry = log_queue.get_nowait()
                 self.log_message(entry.get("message", ""), entry.get("tag", "info"))
-            status = carregar_status()
-            self.status_label.configure(text=f"Estado: {status.get('estado')} | Processo: {status.get('processo_ativo')}")
+            status, self._status_pendente = self._status_pendente, None
+            if status is not None:
+                self.status_label.configure(text=self._texto_status(status))
         finally:
             self.after(120, self.drain_log_queue)
 
@@ -214,6 +226,10 @@ class AssistenteMestreGUI(ctk.CTk):
             while not ui_voice_queue.empty():
                 entry = ui_voice_queue.get_nowait()
                 msg = entry.get('message', str(entry))
+                if entry.get('type') == 'voice_partial':
+                    # Transcrições parciais só atualizam a linha de status, sem poluir o log
+                    self.status_label.configure(text=f"Voz: {msg}")
+                    continue
                 self.log_message(f"[VOZ] {msg}", "voz")
                 self.status_label.configure(text=f"Voz: {msg}")
         finally:
@@ -223,7 +239,9 @@ class AssistenteMestreGUI(ctk.CTk):
         if messagebox.askokcancel("Sair", "Tem certeza que quer encerrar o assistente?"):
             if self.monitor and self.monitor.is_running: 
                 self.monitor.stop()
+            status_bus.cancelar_assinatura(self._on_status_change)
             update_status("padrao", None)
+            status_bus.flush()
             try:
                 if self.loop.is_running():
                     self.loop.call_soon_threadsafe(self.loop.stop)
@@ -231,98 +249,171 @@ class AssistenteMestreGUI(ctk.CTk):
                 print(f"Erro ao parar o loop: {e}")
             self.destroy()
 
+LANE_MIDIA = "midia"
+LANE_NAVEGADOR = "navegador"
+LANE_DESKTOP = "desktop"
+COMANDOS_MEDIA = ["play", "pause", "pausar", "continuar", "retomar"]
+
+def rotear_comando(comando_completo: str):
+    """Decide a lane e a prioridade de um comando. Tokens do vigia furam a fila da lane de mídia."""
+    comando_lower = comando_completo.strip().lower()
+    if comando_lower in ("__vigia_pause__", "__vigia_resume__"):
+        return LANE_MIDIA, PRIORIDADE_ALTA
+    if comando_lower in COMANDOS_MEDIA or comando_lower == "cancelar" or comando_lower.startswith("__vigia"):
+        return LANE_MIDIA, PRIORIDADE_NORMAL
+    if comando_lower.split(',', 1)[0].strip() == "pc" and ',' in comando_lower:
+        return LANE_DESKTOP, PRIORIDADE_NORMAL
+    return LANE_NAVEGADOR, PRIORIDADE_NORMAL
+
 async def bot_main(gui_instance: AssistenteMestreGUI):
-    page = None
+    pool = None
     context = None
     p = None
-    try:
-        from playwright.async_api import async_playwright
-        p = await async_playwright().start()
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "playwright_profile"),
-            headless=False,
-            args=['--disable-blink-features=AutomationControlled', '--start-maximized', '--disable-session-crashed-bubble']
-        )
-        if context.pages: page = context.pages[0]
-        else: page = await context.new_page()
-        await page.goto("https://www.google.com", timeout=60000)
-        screen_size = await page.evaluate('() => ({width: window.screen.width, height: window.screen.height})')
-        await page.set_viewport_size(screen_size)
-        log_interface("[WEB] Navegador Chromium iniciado e pronto.", "web")
-    except Exception as e:
-        log_interface(f"[WEB] ERRO: Não foi possível iniciar o navegador: {e}", "error")
+
+    async def iniciar_navegador():
+        nonlocal pool, context, p
+        try:
+            from playwright.async_api import async_playwright
+            if p is None:
+                p = await async_playwright().start()
+            context = await p.chromium.launch_persistent_context(
+                user_data_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "playwright_profile"),
+                headless=False,
+                args=['--disable-blink-features=AutomationControlled', '--start-maximized', '--disable-session-crashed-bubble']
+            )
+            if carregar_config_geral().get("web_perfil_rapido", False):
+                ativar_perfil_rapido()
+            if context.pages: page = context.pages[0]
+            else: page = await context.new_page()
+            await page.goto("https://www.google.com", timeout=60000)
+            screen_size = await page.evaluate('() => ({width: window.screen.width, height: window.screen.height})')
+            await page.set_viewport_size(screen_size)
+            pool = PagePool(context, page, carregar_config_geral().get("web_max_abas", 4))
+            log_interface("[WEB] Navegador Chromium iniciado e pronto.", "web")
+        except Exception as e:
+            log_interface(f"[WEB] ERRO: Não foi possível iniciar o navegador: {e}", "error")
+            # Falha depois do launch (goto, viewport...): fecha o contexto para a próxima tentativa recomeçar do zero
+            if context is not None:
+                try: await context.close()
+                except Exception: pass
+                context = None
+
+    async def navegador_pronto() -> bool:
+        """No modo lite o Chromium só sobe aqui, no primeiro vídeo/link aberto; após uma falha, tenta de novo."""
+        if pool is None:
+            await iniciar_navegador()
+        return pool is not None
+
+    async def aba_de_busca(chave: str):
+        if not await navegador_pronto():
+            raise RuntimeError("navegador indisponível")
+        return await pool.aba(chave)
+
+    busca = criar_backend_pesquisa(carregar_config_geral().get("web_backend", "playwright"), aba_de_busca)
+    if busca.nome != "lite":
+        await iniciar_navegador()
+
+    scheduler = CommandScheduler(roteador=rotear_comando)
+
+    async def lane_midia(comando_completo: str):
+        comando_lower = comando_completo.lower()
+        if comando_lower == "cancelar":
+            cancelados = scheduler.cancelar_jobs()
+            log_interface(f"[SYSTEM] {cancelados} automação(ões) em andamento cancelada(s).", "warning")
+        elif comando_lower == "__vigia_pause__":
+            if pool: await pausar_video(pool.player)
+        elif comando_lower == "__vigia_resume__":
+            if pool: await retomar_video(pool.player)
+        elif comando_lower in COMANDOS_MEDIA:
+            if pool: await pausar_video(pool.player)
+
+    async def lane_navegador(comando_completo: str):
+        comando_lower = comando_completo.lower()
+        if comando_lower in ("historico", "histórico"):
+            listar_historico()
+            return
+
+        # "3" usa o conjunto atual; "2.3" usa o 3º resultado da 2ª pesquisa mais recente
+        conjunto, _, numero_txt = comando_lower.rpartition('.')
+        if numero_txt.isdigit() and (not conjunto or conjunto.isdigit()):
+            if conjunto and not selecionar_conjunto(int(conjunto)):
+                return
+            numero = int(numero_txt)
+            from core_web import ultimos_resultados_pesquisa
+            if ultimos_resultados_pesquisa:
+                tipo = ultimos_resultados_pesquisa[0].get("tipo")
+                if tipo == "yt":
+                    if await navegador_pronto(): await tocar_video_youtube(numero, pool.player, pool)
+                elif tipo == "web":
+                    if await navegador_pronto(): await abrir_link_web(numero, pool.player)
+            else:
+                log_interface(f"Digite um número apenas após uma pesquisa.", "warning")
+            return
+
+        partes = comando_completo.split(',', 1)
+        if len(partes) != 2:
+            log_interface(f"Comando ou formato inválido: '{comando_completo}'", "error")
+            return
+        prefixo = partes[0].strip().lower()
+        acao = partes[1].strip()
+        # As pesquisas rodam em abas de fundo (ou sem navegador, no modo lite): o vídeo do player continua tocando
+        if prefixo == "yt":
+            videos = await pesquisar_youtube(acao, busca)
+            if pool and videos and carregar_config_geral().get("web_pre_carregar", True):
+                await pool.pre_carregar(videos[0]["url"])
+        elif prefixo == "web":
+            await pesquisar_google(acao, busca)
+        else:
+            log_interface(f"Prefixo '{prefixo}' desconhecido.", "error")
+
+    async def abrir_app_em_segundo_plano(nome: str):
+        try:
+            await scheduler.executar_bloqueante(abrir_app_desktop, nome, cancelavel=True)
+        except Exception as e:
+            log_interface(f"[DESKTOP] Erro na automação de '{nome}': {e}", "error")
+
+    async def lane_desktop(comando_completo: str):
+        acao = comando_completo.split(',', 1)[1].strip()
+        ordem = interpretar_comando_desktop(acao)
+        if ordem:
+            if ordem["funcao"] == "fechar_app":
+                gui_instance.overlay.set_estado_emocao("chorando")
+                await asyncio.sleep(2)
+                await scheduler.executar_bloqueante(fechar_app, ordem["parametros"]["nome"])
+                gui_instance.overlay.hide()
+            elif ordem["funcao"] == "abrir_app":
+                # A automação do launcher pode levar minutos: roda no pool sem segurar a lane
+                scheduler.disparar(abrir_app_em_segundo_plano(ordem["parametros"]["nome"]))
+            elif ordem["funcao"] == "abrir_site":
+                await scheduler.executar_bloqueante(abrir_site_known, ordem["parametros"]["nome"])
+        else:
+            log_interface(f"Não reconheci o comando '{acao}'. Abrindo assistente de aprendizado...", "warning")
+            gui_instance.loop.call_soon_threadsafe(gui_instance.trigger_learning_flow, acao)
+
+    scheduler.registrar_lane(LANE_MIDIA, lane_midia)
+    scheduler.registrar_lane(LANE_NAVEGADOR, lane_navegador)
+    scheduler.registrar_lane(LANE_DESKTOP, lane_desktop)
+    scheduler.start()
 
     log_interface("[SYSTEM] 🤖 Robô Mestre Pronto!", "success")
     
     while True:
         try:
-            comando_completo = (await async_command_queue.get()).strip()
+            comando_completo = await async_command_queue.get()
             if comando_completo is None: break
-            
-            comando_lower = comando_completo.lower()
-            comandos_media = ["play", "pause", "pausar", "continuar", "retomar"]
-
-            if comando_lower in comandos_media:
-                if page: await pausar_video(page)
-                async_command_queue.task_done()
-                continue
-            if comando_lower.startswith("__vigia"):
-                if comando_lower == "__vigia_pause__":
-                    if page: await pausar_video(page)
-                elif comando_lower == "__vigia_resume__":
-                    if page: await retomar_video(page)
-                async_command_queue.task_done()
-                continue
-            
-            if comando_lower.isdigit():
-                numero = int(comando_lower)
-                from core_web import ultimos_resultados_pesquisa
-                if ultimos_resultados_pesquisa:
-                    tipo = ultimos_resultados_pesquisa[0].get("tipo")
-                    if tipo == "yt":
-                        if page: await tocar_video_youtube(numero, page)
-                    elif tipo == "web":
-                        if page: await abrir_link_web(numero, page)
-                else:
-                    log_interface(f"Digite um número apenas após uma pesquisa.", "warning")
-                async_command_queue.task_done()
-                continue
-
-            partes = comando_completo.split(',', 1)
-            if len(partes) == 2:
-                prefixo = partes[0].strip().lower()
-                acao = partes[1].strip()
-
-                if prefixo == "yt":
-                    if page: await pesquisar_youtube(acao, page)
-                elif prefixo == "web":
-                    if page: await pesquisar_google(acao, page)
-                elif prefixo == "pc":
-                    ordem = interpretar_comando_desktop(acao)
-                    if ordem:
-                        if ordem["funcao"] == "fechar_app":
-                            gui_instance.overlay.set_estado_emocao("chorando")
-                            await asyncio.sleep(2)
-                            fechar_app(ordem["parametros"]["nome"])
-                            gui_instance.overlay.hide()
-                        elif ordem["funcao"] == "abrir_app":
-                            abrir_app_desktop(ordem["parametros"]["nome"])
-                        elif ordem["funcao"] == "abrir_site":
-                            abrir_site_known(ordem["parametros"]["nome"])
-                    else:
-                        log_interface(f"Não reconheci o comando '{acao}'. Abrindo assistente de aprendizado...", "warning")
-                        gui_instance.loop.call_soon_threadsafe(gui_instance.trigger_learning_flow, acao)
-                else:
-                    log_interface(f"Prefixo '{prefixo}' desconhecido.", "error")
-            else:
-                log_interface(f"Comando ou formato inválido: '{comando_completo}'", "error")
-
+            comando_completo = comando_completo.strip()
+            if comando_completo:
+                await scheduler.submeter(comando_completo)
             async_command_queue.task_done()
         except asyncio.CancelledError:
             break
         except Exception as e:
             log_interface(f"[SYSTEM] Erro crítico no loop principal: {e}", "error")
 
+    await scheduler.stop()
+    await busca.fechar()
+    if pool:
+        await pool.fechar()
     if context:
         try: await context.close()
         except: pass
@@ -346,7 +437,31 @@ def main():
         if async_loop.is_running():
             asyncio.run_coroutine_threadsafe(async_command_queue.put(token_str), async_loop)
 
-    vigia_manager = VigiaManager(schedule_cmd=schedule_cmd_token_real, model_path="yolov8n.pt", log_fn=log_interface)
+    config = carregar_config_geral()
+    try:
+        orcamento_jogo = criar_orcamento(config.get("vigia_orcamento_jogo"))
+    except ValueError as e:
+        log_interface(f"[VIGIA] {e} Usando 'reduzido'.", "warning")
+        orcamento_jogo = criar_orcamento(None)
+    vigia_manager = VigiaManager(
+        schedule_cmd=schedule_cmd_token_real,
+        model_path="yolov8n.pt",
+        detector_backend=config.get("vigia_detector", "auto"),
+        imgsz=config.get("vigia_imgsz", 320),
+        imgsz_reduzido=orcamento_jogo.imgsz,
+        camera_idle_seconds=config.get("vigia_camera_ociosa_s", 60.0),
+        fonte=config.get("vigia_fonte"),
+        log_fn=log_interface
+    )
+    if config.get("vigia_precarregar", False):
+        vigia_manager.preload()
+    # O status.json pode ter ficado em "jogando" se o app caiu durante um jogo: parte do repouso e
+    # deixa o primeiro scan do PCMonitor dizer se há jogo rodando
+    update_status("padrao", None)
+    vigia_governor = VigiaGovernor(vigia_manager, orcamento_jogo, publicar_fn=status_bus.publicar)
+    status_bus.publicar(vigia_orcamento=vigia_manager.orcamento.nome)
+    status_bus.assinar(vigia_governor.on_status)
+    vigia_governor.on_status(status_bus.get())
     
     forwarder_thread = threading.Thread(target=voice_forwarder_thread, args=(async_loop, voice_forward_queue), daemon=True)
     forwarder_thread.start()
@@ -386,8 +501,7 @@ def main():
 
     if monitor.is_running: 
         monitor.stop()
-    if vigia_manager.is_running(): 
-        vigia_manager.stop()
+    vigia_manager.shutdown()
 
     voice_forward_queue.put(None)
     if forwarder_thread.is_alive():
@@ -395,6 +509,7 @@ def main():
     
     voice_core.stop()
     update_status("padrao", None)
+    status_bus.flush()
     
     if bot_thread.is_alive():
         bot_thread.join(timeout=2)